@@ -5,9 +5,13 @@ Playwright-based automation for bank portals when APIs are unavailable.
 """
 
 import asyncio
+import copy
 import logging
 import os
-from dataclasses import dataclass, field
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
 from datetime import datetime, date
 from decimal import Decimal
 from pathlib import Path
@@ -17,8 +21,60 @@ import json
 
 logger = logging.getLogger(__name__)
 
+# Directories already created by this process
+_MKDIR_CACHE: set[Path] = set()
 
-class RPAAction(Enum):
+
+# One balance amount: optional minus sign or parentheses, optional peso
+# marker, comma-grouped or plain digits, up to two decimals. The lookarounds
+# keep digits that belong to dates or account numbers ("2024-01-15",
+# "1234-5678") from being read as part of the amount.
+_BALANCE_RE = re.compile(
+    r"(?<![\w.,/-])"
+    r"(?P<open>\()?(?P<sign>-)?(?:₱|(?i:PHP))?\s*(?P<sign2>-)?"
+    r"(?P<whole>\d{1,3}(?:,\d{3})+|\d+)(?:\.(?P<frac>\d{1,2}))?"
+    r"(?P<close>\))?"
+    r"(?![\w.,/-])"
+)
+
+
+def parse_balance_cents(text: str) -> int | None:
+    """Parse portal balance text such as "PHP 1,234,567.89" into int cents.
+
+    Args:
+        text: Balance text scraped from the portal
+
+    Returns:
+        Balance in cents, or None if the text has no digits (e.g. "N/A")
+
+    Raises:
+        ValueError: If the text has digits but not exactly one amount
+    """
+    if not any(ch.isdigit() for ch in text):
+        return None
+
+    matches = list(_BALANCE_RE.finditer(text))
+    if len(matches) != 1:
+        raise ValueError(
+            f"Expected one balance amount, found {len(matches)}: {text!r}"
+        )
+
+    match = matches[0]
+    cents = int(match["whole"].replace(",", "")) * 100 + int(
+        (match["frac"] or "").ljust(2, "0")
+    )
+    negative = match["sign"] or match["sign2"] or (match["open"] and match["close"])
+    return -cents if negative else cents
+
+
+def _ensure_dir(path: Path) -> None:
+    """Create a directory once per process."""
+    if path not in _MKDIR_CACHE:
+        path.mkdir(parents=True, exist_ok=True)
+        _MKDIR_CACHE.add(path)
+
+
+class RPAAction(str, Enum):
     """Types of RPA actions."""
     LOGIN = "login"
     DOWNLOAD_STATEMENT = "download_statement"
@@ -28,7 +84,7 @@ class RPAAction(Enum):
     LOGOUT = "logout"
 
 
-class RPAStatus(Enum):
+class RPAStatus(str, Enum):
     """RPA execution status."""
     SUCCESS = "success"
     FAILED = "failed"
@@ -56,6 +112,13 @@ class RPAResult:
     def success(self) -> bool:
         return self.status == RPAStatus.SUCCESS
 
+    def decimal_balance(self, account: str = "main") -> Decimal | None:
+        """Get a balance from a check_balance result as Decimal."""
+        cents = self.data.get("balances", {}).get(account)
+        if cents is None:
+            return None
+        return Decimal(cents).scaleb(-2)
+
     def to_dict(self) -> dict:
         return {
             "action": self.action.value,
@@ -91,11 +154,24 @@ class BankPortalAutomation:
     PAGE_TIMEOUT = 30000  # 30 seconds
     NAVIGATION_TIMEOUT = 60000  # 60 seconds
 
+    # Balance snapshot cache TTL and size bound
+    BALANCE_TTL_SECONDS = 60.0
+    BALANCE_CACHE_SIZE = 256
+
+    # Successful balance checks, shared across instances because n8n builds a
+    # new automation per request: (bank, username, account) -> (stored_at, result).
+    # Kept in least-recently-used order so the oldest entry is evicted first.
+    _balance_cache: OrderedDict[tuple[str, str, str], tuple[float, RPAResult]] = (
+        OrderedDict()
+    )
+
     def __init__(
         self,
         config_dir: Path | str | None = None,
         headless: bool = True,
-        screenshot_dir: Path | str | None = None
+        screenshot_dir: Path | str | None = None,
+        balance_ttl_seconds: float | None = None,
+        capture_success_screenshots: bool = False
     ):
         """Initialize RPA automation.
 
@@ -103,11 +179,19 @@ class BankPortalAutomation:
             config_dir: Path to configuration directory
             headless: Run browser in headless mode
             screenshot_dir: Directory for screenshots
+            balance_ttl_seconds: How long a balance snapshot is reused (0 disables)
+            capture_success_screenshots: Also screenshot successful logins
         """
         self.config_dir = Path(config_dir) if config_dir else Path(__file__).parent.parent.parent / "config"
         self.headless = headless
+        self.balance_ttl_seconds = (
+            self.BALANCE_TTL_SECONDS
+            if balance_ttl_seconds is None
+            else balance_ttl_seconds
+        )
         self.screenshot_dir = Path(screenshot_dir) if screenshot_dir else Path("/tmp/rpa_screenshots")
-        self.screenshot_dir.mkdir(parents=True, exist_ok=True)
+        _ensure_dir(self.screenshot_dir)
+        self.capture_success_screenshots = capture_success_screenshots
 
         self._browser = None
         self._context = None
@@ -154,9 +238,12 @@ class BankPortalAutomation:
             Path to screenshot
         """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{name}_{timestamp}.png"
+        filename = f"{name}_{timestamp}.jpg"
         path = self.screenshot_dir / filename
-        await self._page.screenshot(path=str(path))
+        # Viewport JPEG is far cheaper to encode and write than a PNG
+        await self._page.screenshot(
+            path=str(path), type="jpeg", quality=70, full_page=False
+        )
         return str(path)
 
     async def login(
@@ -201,8 +288,8 @@ class BankPortalAutomation:
             result = await login_handler(credentials, otp_callback)
             result.duration_seconds = (datetime.now() - start_time).total_seconds()
 
-            # Take success screenshot
-            if result.success:
+            # Success screenshots are opt-in; error screenshots are always taken
+            if result.success and self.capture_success_screenshots:
                 ss = await self._take_screenshot(f"login_success_{bank}")
                 result.screenshots.append(ss)
 
@@ -284,9 +371,12 @@ class BankPortalAutomation:
             )
 
         except Exception as e:
-            # Check for maintenance
-            page_content = await self._page.content()
-            if "maintenance" in page_content.lower():
+            # Check for maintenance (scan visible text in-page, not the full DOM)
+            maintenance_hit = await self._page.evaluate(
+                "() => /maintenance|scheduled downtime|unavailable/i"
+                ".test((document.body?.innerText || '').slice(0, 4000))"
+            )
+            if maintenance_hit:
                 return RPAResult(
                     action=RPAAction.LOGIN,
                     status=RPAStatus.MAINTENANCE,
@@ -348,7 +438,7 @@ class BankPortalAutomation:
         """
         start_time = datetime.now()
         output_dir = Path(output_dir)
-        output_dir.mkdir(parents=True, exist_ok=True)
+        _ensure_dir(output_dir)
 
         try:
             # Login first
@@ -441,6 +531,24 @@ class BankPortalAutomation:
         Returns:
             RPAResult with balance data
         """
+        cache_key = (
+            credentials.bank.lower(),
+            credentials.username,
+            account_number or "*",
+        )
+        cached = self._balance_cache.get(cache_key)
+        if cached:
+            if time.monotonic() - cached[0] < self.balance_ttl_seconds:
+                self._balance_cache.move_to_end(cache_key)
+                # Callers may modify their result; the cached snapshot must not change
+                snapshot = cached[1]
+                return replace(
+                    snapshot,
+                    data=copy.deepcopy(snapshot.data),
+                    screenshots=list(snapshot.screenshots)
+                )
+            del self._balance_cache[cache_key]
+
         start_time = datetime.now()
 
         try:
@@ -448,27 +556,39 @@ class BankPortalAutomation:
             if not login_result.success:
                 return login_result
 
-            # Get balances from dashboard
-            balances = {}
-
-            # Generic balance extraction
-            balance_elements = await self._page.query_selector_all(
-                ".balance, .account-balance, [data-balance]"
+            # Get balances from dashboard in a single round trip
+            raw_balances = await self._page.eval_on_selector_all(
+                ".balance, .account-balance, [data-balance]",
+                "els => els.map(e => "
+                "[e.getAttribute('data-account') || 'main', e.innerText])"
             )
 
-            for elem in balance_elements:
-                text = await elem.inner_text()
-                # Parse balance from text
-                # This would need bank-specific parsing
-                balances[await elem.get_attribute("data-account") or "main"] = text
-
-            return RPAResult(
+            # Parse once here; balances are kept as int cents
+            balances = {}
+            balances_formatted = {}
+            for account, text in raw_balances:
+                try:
+                    cents = parse_balance_cents(text)
+                except ValueError:
+                    cents = None
+                if cents is None:
+                    logger.warning(f"Could not parse balance for {account}: {text!r}")
+                    continue
+                balances[account] = cents
+                whole, frac = divmod(abs(cents), 100)
+                sign = "-" if cents < 0 else ""
+                balances_formatted[account] = f"{sign}{whole:,}.{frac:02d}"
+
+            result = RPAResult(
                 action=RPAAction.CHECK_BALANCE,
                 status=RPAStatus.SUCCESS,
                 message="Balance check successful",
-                data={"balances": balances},
+                data={"balances": balances, "balances_formatted": balances_formatted},
                 duration_seconds=(datetime.now() - start_time).total_seconds()
             )
+            self._store_balance(cache_key, result)
+
+            return result
 
         except Exception as e:
             logger.error(f"Balance check error: {e}")
@@ -510,6 +630,20 @@ class BankPortalAutomation:
         finally:
             await self._close_browser()
 
+    @classmethod
+    def _store_balance(cls, key: tuple[str, str, str], result: RPAResult) -> None:
+        """Cache a balance snapshot, evicting the least recently used past the bound."""
+        cache = cls._balance_cache
+        cache[key] = (time.monotonic(), result)
+        cache.move_to_end(key)
+        while len(cache) > cls.BALANCE_CACHE_SIZE:
+            cache.popitem(last=False)
+
+    @classmethod
+    def clear_balance_cache(cls) -> None:
+        """Drop all cached balance snapshots."""
+        cls._balance_cache.clear()
+
     def run_sync(self, coro):
         """Run async function synchronously.
 
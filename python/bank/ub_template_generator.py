@@ -4,21 +4,102 @@ UnionBank Template Generator Module
 Generates CSV templates for UnionBank bulk transfers (payroll, supplier payments).
 """
 
-import csv
 import hashlib
+import json
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, date
 from decimal import Decimal
-from io import StringIO
+from io import BytesIO
+from itertools import islice
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, Iterator
 from enum import Enum
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to stdlib json
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Characters stripped from account numbers
+_ACCT_CLEAN = str.maketrans("", "", "- ")
+
+
+def _csv_field(value: str) -> str:
+    """Quote a CSV field only when it needs it (csv.QUOTE_MINIMAL rules)."""
+    if '"' in value:
+        return '"' + value.replace('"', '""') + '"'
+    if "," in value or "\n" in value or "\r" in value:
+        return f'"{value}"'
+    return value
+
+
+def _fmt_cents(cents: int) -> str:
+    """Format centavos as a plain decimal string, e.g. 123450 -> '1234.50'."""
+    if cents < 0:
+        return "-" + _fmt_cents(-cents)
+    whole, frac = divmod(cents, 100)
+    return f"{whole}.{frac:02d}"
+
+
+def _to_cents(amount: Decimal | int | float) -> int:
+    """Convert a peso amount to integer centavos."""
+    return int((Decimal(amount) * 100).to_integral_value())
+
+
+def _aggregate_cents(
+    entries: list["PayrollEntry"],
+    bank_name_map: dict[str, str]
+) -> tuple[int, dict[str, list[int]], dict[str, list[int]]]:
+    """Aggregate entries by department and bank in one pass over int cents.
+
+    Args:
+        entries: Payroll entries
+        bank_name_map: Bank code -> display name
+
+    Returns:
+        Tuple of (total_cents, {dept: [count, cents]}, {bank: [count, cents]})
+    """
+    total = 0
+    by_dept: dict[str, list[int]] = {}
+    by_bank: dict[str, list[int]] = {}
+    dept_get = by_dept.get
+    bank_get = by_bank.get
+    bank_name = bank_name_map.get
+
+    for entry in entries:
+        amount = entry._amount_cents
+        total += amount
+
+        dept = entry.department or "Unassigned"
+        bucket = dept_get(dept)
+        if bucket is None:
+            by_dept[dept] = [1, amount]
+        else:
+            bucket[0] += 1
+            bucket[1] += amount
+
+        bank = bank_name(entry.bank_code, entry.bank_code)
+        bucket = bank_get(bank)
+        if bucket is None:
+            by_bank[bank] = [1, amount]
+        else:
+            bucket[0] += 1
+            bucket[1] += amount
+
+    return total, by_dept, by_bank
+
 
 class TransferType(Enum):
     """Types of bank transfers."""
@@ -29,7 +110,7 @@ class TransferType(Enum):
     UTILITIES = "utilities"
 
 
-@dataclass
+@dataclass(slots=True)
 class PayrollEntry:
     """A single payroll entry for transfer."""
 
@@ -42,6 +123,22 @@ class PayrollEntry:
     department: str = ""
     entity: str = ""
 
+    # Centavos for the amount object they were computed from, so
+    # reassigning amount is picked up on the next read
+    _cents: int = field(default=0, init=False, repr=False, compare=False)
+    _cents_of: Decimal | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @property
+    def _amount_cents(self) -> int:
+        """Amount in centavos, used for all internal arithmetic."""
+        amount = self.amount
+        if amount is not self._cents_of:
+            self._cents = _to_cents(amount)
+            self._cents_of = amount
+        return self._cents
+
     def validate(self) -> tuple[bool, str]:
         """Validate the entry.
 
@@ -57,7 +154,7 @@ class PayrollEntry:
         if len(self.account_number) < 10:
             return False, f"Invalid account number for {self.employee_name}"
 
-        if self.amount <= 0:
+        if self._amount_cents <= 0:
             return False, f"Invalid amount for {self.employee_name}"
 
         if not self.bank_code:
@@ -71,7 +168,8 @@ class PayrollEntry:
             "employee_name": self.employee_name,
             "bank_code": self.bank_code,
             "account_number": self.account_number,
-            "amount": float(self.amount),
+            "amount": _fmt_cents(self._amount_cents),
+            "amount_cents": self._amount_cents,
             "remarks": self.remarks,
             "department": self.department,
             "entity": self.entity
@@ -92,10 +190,15 @@ class TransferBatch:
     status: str = "pending"  # pending, approved, submitted, completed
     approval_required: bool = True
 
+    @property
+    def total_cents(self) -> int:
+        """Total transfer amount in centavos."""
+        return sum(e._amount_cents for e in self.entries)
+
     @property
     def total_amount(self) -> Decimal:
         """Calculate total transfer amount."""
-        return sum(e.amount for e in self.entries)
+        return Decimal(self.total_cents).scaleb(-2)
 
     @property
     def entry_count(self) -> int:
@@ -110,6 +213,15 @@ class TransferBatch:
         """
         errors = []
         for entry in self.entries:
+            # One combined check per entry; PayrollEntry.validate is only
+            # called to build the message for the rare failing entry
+            if (
+                entry.employee_id
+                and len(entry.account_number) >= 10
+                and entry._amount_cents > 0
+                and entry.bank_code
+            ):
+                continue
             is_valid, error = entry.validate()
             if not is_valid:
                 errors.append(error)
@@ -117,12 +229,14 @@ class TransferBatch:
         return len(errors) == 0, errors
 
     def to_dict(self) -> dict:
+        total_cents = self.total_cents
         return {
             "batch_id": self.batch_id,
             "transfer_type": self.transfer_type.value,
             "entity": self.entity,
             "transfer_date": self.transfer_date.isoformat(),
-            "total_amount": float(self.total_amount),
+            "total_amount": _fmt_cents(total_cents),
+            "total_cents": total_cents,
             "entry_count": self.entry_count,
             "created_at": self.created_at.isoformat(),
             "created_by": self.created_by,
@@ -130,14 +244,20 @@ class TransferBatch:
             "entries": [e.to_dict() for e in self.entries]
         }
 
+    def to_json(self) -> bytes:
+        """Serialize the batch to JSON bytes (uses orjson when installed)."""
+        if orjson is not None:
+            return orjson.dumps(self.to_dict())
+        return json.dumps(self.to_dict()).encode()
 
-@dataclass
+
+@dataclass(slots=True)
 class TransferTemplate:
     """Generated transfer template."""
 
     batch_id: str
     filename: str
-    content: str
+    content: str | None  # None when streamed straight to disk
     format: str  # 'csv', 'xlsx'
     checksum: str
     generated_at: datetime = field(default_factory=datetime.now)
@@ -174,6 +294,15 @@ class UnionBankTemplateGenerator:
         "maya": "999010027",
     }
 
+    # Reverse lookup for summaries: bank code -> display name
+    BANK_NAME_MAP = {code: name.upper() for name, code in BANK_CODES.items()}
+
+    # Rows per encoded chunk when streaming CSV output
+    CSV_CHUNK_ROWS = 1000
+
+    # Parsed entity configs shared across instances: path -> (mtime_ns, config)
+    _CONFIG_CACHE: dict[Path, tuple[int, dict]] = {}
+
     def __init__(
         self,
         config_dir: Path | str | None = None,
@@ -193,11 +322,21 @@ class UnionBankTemplateGenerator:
         """Load configuration."""
         # Load entity config for account mappings
         entity_file = self.config_dir / "entity_config.yaml"
-        if entity_file.exists():
-            with open(entity_file) as f:
-                self.entity_config = yaml.safe_load(f)
-        else:
+        try:
+            mtime = entity_file.stat().st_mtime_ns
+        except FileNotFoundError:
             self.entity_config = {"entities": {}}
+            return
+
+        # Reuse the parsed file until it changes on disk
+        cached = self._CONFIG_CACHE.get(entity_file)
+        if cached and cached[0] == mtime:
+            self.entity_config = cached[1]
+            return
+
+        with open(entity_file) as f:
+            self.entity_config = yaml.load(f, Loader=_YamlLoader)
+        self._CONFIG_CACHE[entity_file] = (mtime, self.entity_config)
 
     def get_bank_code(self, bank_name: str) -> str | None:
         """Get INSTAPAY bank code for a bank.
@@ -271,11 +410,11 @@ class UnionBankTemplateGenerator:
             raise ValueError(f"Unknown bank: {bank_name}")
 
         # Clean account number
-        clean_account = account_number.replace("-", "").replace(" ", "")
+        clean_account = account_number.translate(_ACCT_CLEAN)
 
         # Default remarks if not provided
         if not remarks:
-            remarks = f"PAYROLL {batch.transfer_date.strftime('%b %Y').upper()}"
+            remarks = self._default_remarks(batch)
 
         entry = PayrollEntry(
             employee_id=employee_id,
@@ -291,6 +430,11 @@ class UnionBankTemplateGenerator:
         batch.entries.append(entry)
         return entry
 
+    @staticmethod
+    def _default_remarks(batch: TransferBatch) -> str:
+        """Default transfer remarks for a batch, e.g. 'PAYROLL JAN 2025'."""
+        return f"PAYROLL {batch.transfer_date.strftime('%b %Y').upper()}"
+
     def add_entries_from_payroll_data(
         self,
         batch: TransferBatch,
@@ -309,9 +453,13 @@ class UnionBankTemplateGenerator:
         added = 0
         errors = []
 
+        # Same for every row, so format the date once
+        default_remarks = self._default_remarks(batch)
+        add_entry = self.add_payroll_entry
+
         for record in payroll_data:
             try:
-                self.add_payroll_entry(
+                add_entry(
                     batch=batch,
                     employee_id=str(record.get("employee_id", "")),
                     employee_name=record.get("employee_name", ""),
@@ -319,7 +467,7 @@ class UnionBankTemplateGenerator:
                     account_number=str(record.get("account_number", "")),
                     amount=Decimal(str(record.get("net_pay", 0))),
                     department=record.get("department", ""),
-                    remarks=record.get("remarks", "")
+                    remarks=record.get("remarks") or default_remarks
                 )
                 added += 1
             except Exception as e:
@@ -327,51 +475,147 @@ class UnionBankTemplateGenerator:
 
         return added, errors
 
-    def generate_csv(self, batch: TransferBatch) -> TransferTemplate:
-        """Generate UnionBank CSV template.
+    def add_entries_from_dataframe(
+        self,
+        batch: TransferBatch,
+        df: Any
+    ) -> tuple[int, list[str]]:
+        """Add entries from a pandas DataFrame of payroll records.
+
+        Vectorized counterpart of add_entries_from_payroll_data for large
+        payroll files: cleaning, bank code mapping and amount conversion run
+        column-wise before entries are built.
 
         Args:
-            batch: Transfer batch
+            batch: Target batch
+            df: DataFrame with the same columns as the payroll data records
 
         Returns:
-            TransferTemplate with CSV content
+            Tuple of (added_count, list of errors)
         """
-        # Validate batch first
-        is_valid, errors = batch.validate()
-        if not is_valid:
-            raise ValueError(f"Batch validation failed: {'; '.join(errors)}")
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError("pandas not installed. Run: pip install pandas")
+
+        def column(name: str):
+            # convert_dtypes keeps integer columns padded with NaN as Int64,
+            # so IDs and account numbers read "1001234567" rather than
+            # "1001234567.0"; missing cells stay <NA> instead of "nan"
+            if name in df.columns:
+                return df[name].convert_dtypes().astype("string")
+            return pd.Series(pd.NA, index=df.index, dtype="string")
+
+        required = {
+            "employee_id": column("employee_id"),
+            "bank": column("bank"),
+            "account_number": column("account_number"),
+            "net_pay": df["net_pay"] if "net_pay" in df.columns else column("net_pay"),
+        }
+        missing = pd.DataFrame(
+            {name: values.isna() for name, values in required.items()}
+        )
+        has_missing = missing.any(axis=1)
+
+        employee_ids = required["employee_id"].fillna("")
+        banks = required["bank"].fillna("")
+        bank_codes = banks.str.lower().map(self.BANK_CODES)
+        accounts = required["account_number"].fillna("").str.translate(_ACCT_CLEAN)
+        net_pay = pd.to_numeric(required["net_pay"], errors="coerce")
+        remarks = column("remarks").fillna("").replace("", self._default_remarks(batch))
+
+        # Collect errors for all bad rows in one masked pass
+        errors = [
+            f"Row {emp_id or '?'}: Missing {', '.join(missing.columns[row])}"
+            for emp_id, row in zip(
+                employee_ids[has_missing], missing[has_missing].to_numpy()
+            )
+        ]
+        unknown_bank = bank_codes.isna() & ~has_missing
+        bad_amount = net_pay.isna() & ~unknown_bank & ~has_missing
+        errors.extend(
+            f"Row {emp_id or '?'}: Unknown bank: {bank}"
+            for emp_id, bank in zip(employee_ids[unknown_bank], banks[unknown_bank])
+        )
+        errors.extend(
+            f"Row {emp_id or '?'}: Invalid amount: {value}"
+            for emp_id, value in zip(
+                employee_ids[bad_amount], df.loc[bad_amount, "net_pay"]
+            )
+        )
 
-        # Generate CSV
-        output = StringIO()
-        writer = csv.writer(output)
+        valid = ~(has_missing | unknown_bank | bad_amount)
+        cents = (net_pay[valid] * 100).round().astype("int64")
 
-        # Write header
-        writer.writerow(self.UB_COLUMNS)
+        entity = batch.entity
+        add_entry = batch.entries.append
+        added = 0
+        for emp_id, name, code, account, amount_cents, remark, dept in zip(
+            employee_ids[valid],
+            column("employee_name").fillna("")[valid],
+            bank_codes[valid],
+            accounts[valid],
+            cents,
+            remarks[valid],
+            column("department").fillna("")[valid],
+        ):
+            add_entry(PayrollEntry(
+                employee_id=emp_id,
+                employee_name=name,
+                bank_code=code,
+                account_number=account,
+                amount=Decimal(int(amount_cents)).scaleb(-2),
+                remarks=remark,
+                department=dept,
+                entity=entity
+            ))
+            added += 1
 
-        # Write entries
-        for entry in batch.entries:
-            writer.writerow([
-                entry.account_number,
-                entry.employee_name.upper(),
-                f"{entry.amount:.2f}",
-                entry.bank_code,
-                entry.remarks,
-                "",  # Email (optional)
-                "",  # Mobile (optional)
-            ])
+        return added, errors
 
-        csv_content = output.getvalue()
+    def _iter_csv_rows(self, batch: TransferBatch) -> Iterator[str]:
+        """Yield UnionBank CSV lines, header first.
 
-        # Generate checksum
-        checksum = hashlib.sha256(csv_content.encode()).hexdigest()[:16]
+        The UB schema is fixed, so rows are formatted directly and only
+        free-text fields go through quoting. Email and Mobile are left blank.
+        """
+        yield ",".join(self.UB_COLUMNS) + "\r\n"
+        for e in batch.entries:
+            yield (
+                f"{_csv_field(e.account_number)},{_csv_field(e.employee_name.upper())},"
+                f"{_fmt_cents(e._amount_cents)},"
+                f"{e.bank_code},{_csv_field(e.remarks)},,\r\n"
+            )
 
-        # Generate filename
-        filename = f"UB_{batch.batch_id}_{checksum}.csv"
+    def _stream_csv(self, batch: TransferBatch, out: BinaryIO) -> str:
+        """Write encoded CSV to a binary stream in chunks.
 
+        Args:
+            batch: Transfer batch
+            out: Binary file-like object
+
+        Returns:
+            Checksum of the written content
+        """
+        digest = hashlib.sha256()
+        rows = self._iter_csv_rows(batch)
+        while chunk := list(islice(rows, self.CSV_CHUNK_ROWS)):
+            data = "".join(chunk).encode()
+            digest.update(data)
+            out.write(data)
+        return digest.hexdigest()[:16]
+
+    def _build_template(
+        self,
+        batch: TransferBatch,
+        checksum: str,
+        content: str | None
+    ) -> TransferTemplate:
+        """Wrap generated CSV output in a TransferTemplate."""
         return TransferTemplate(
             batch_id=batch.batch_id,
-            filename=filename,
-            content=csv_content,
+            filename=f"UB_{batch.batch_id}_{checksum}.csv",
+            content=content,
             format="csv",
             checksum=checksum,
             metadata={
@@ -383,6 +627,72 @@ class UnionBankTemplateGenerator:
             }
         )
 
+    def _validate_batch(self, batch: TransferBatch) -> None:
+        """Raise ValueError if the batch has invalid entries.
+
+        Always re-runs validate(): entries can be replaced or edited in place
+        after an earlier pass, and the check is cheap next to writing the CSV.
+        """
+        is_valid, errors = batch.validate()
+        if not is_valid:
+            raise ValueError(f"Batch validation failed: {'; '.join(errors)}")
+
+    def generate_csv(self, batch: TransferBatch) -> TransferTemplate:
+        """Generate UnionBank CSV template.
+
+        Args:
+            batch: Transfer batch
+
+        Returns:
+            TransferTemplate with CSV content
+        """
+        self._validate_batch(batch)
+
+        buffer = BytesIO()
+        checksum = self._stream_csv(batch, buffer)
+
+        # Decode straight from the buffer's memory; getvalue() would copy it first
+        with buffer.getbuffer() as view:
+            content = str(view, "utf-8")
+
+        return self._build_template(batch, checksum, content)
+
+    def write_csv_to(
+        self,
+        batch: TransferBatch,
+        output_dir: Path | str
+    ) -> TransferTemplate:
+        """Stream a UnionBank CSV template straight to disk.
+
+        For very large batches: the CSV is never held in memory as a whole,
+        so the returned template has no content. The file is written under a
+        temporary name and renamed once the checksum (part of the filename)
+        is known.
+
+        Args:
+            batch: Transfer batch
+            output_dir: Output directory
+
+        Returns:
+            TransferTemplate with metadata["file_path"] set and content None
+        """
+        self._validate_batch(batch)
+
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        partial_path = output_dir / f".UB_{batch.batch_id}.csv.part"
+        with open(partial_path, "wb") as f:
+            checksum = self._stream_csv(batch, f)
+
+        template = self._build_template(batch, checksum, None)
+        file_path = output_dir / template.filename
+        partial_path.replace(file_path)
+        template.metadata["file_path"] = str(file_path)
+
+        logger.info(f"Saved template to {file_path}")
+        return template
+
     def generate_summary(self, batch: TransferBatch) -> str:
         """Generate human-readable summary.
 
@@ -392,6 +702,8 @@ class UnionBankTemplateGenerator:
         Returns:
             Summary string
         """
+        total, by_dept, by_bank = _aggregate_cents(batch.entries, self.BANK_NAME_MAP)
+
         lines = [
             f"📋 *Transfer Batch Summary*",
             f"",
@@ -401,35 +713,24 @@ class UnionBankTemplateGenerator:
             f"*Transfer Date:* {batch.transfer_date.strftime('%Y-%m-%d')}",
             f"",
             f"*Entries:* {batch.entry_count}",
-            f"*Total Amount:* ₱{batch.total_amount:,.2f}",
+            f"*Total Amount:* ₱{Decimal(total).scaleb(-2):,.2f}",
             f"",
         ]
 
-        # Group by department
-        by_dept: dict[str, tuple[int, Decimal]] = {}
-        for entry in batch.entries:
-            dept = entry.department or "Unassigned"
-            count, total = by_dept.get(dept, (0, Decimal("0")))
-            by_dept[dept] = (count + 1, total + entry.amount)
-
         if by_dept:
             lines.append("*By Department:*")
-            for dept, (count, total) in sorted(by_dept.items()):
-                lines.append(f"• {dept}: {count} entries, ₱{total:,.2f}")
-
-        # Group by bank
-        by_bank: dict[str, tuple[int, Decimal]] = {}
-        bank_name_map = {v: k.upper() for k, v in self.BANK_CODES.items()}
-        for entry in batch.entries:
-            bank = bank_name_map.get(entry.bank_code, entry.bank_code)
-            count, total = by_bank.get(bank, (0, Decimal("0")))
-            by_bank[bank] = (count + 1, total + entry.amount)
+            for dept, (count, dept_total) in sorted(by_dept.items()):
+                lines.append(
+                    f"• {dept}: {count} entries, ₱{Decimal(dept_total).scaleb(-2):,.2f}"
+                )
 
         if by_bank:
             lines.append("")
             lines.append("*By Bank:*")
-            for bank, (count, total) in sorted(by_bank.items()):
-                lines.append(f"• {bank}: {count} entries, ₱{total:,.2f}")
+            for bank, (count, bank_total) in sorted(by_bank.items()):
+                lines.append(
+                    f"• {bank}: {count} entries, ₱{Decimal(bank_total).scaleb(-2):,.2f}"
+                )
 
         lines.extend([
             "",
@@ -452,6 +753,12 @@ class UnionBankTemplateGenerator:
         Returns:
             Path to saved file
         """
+        if template.content is None:
+            raise ValueError(
+                f"Template {template.filename} was already written to "
+                f"{template.metadata.get('file_path')}"
+            )
+
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
 
@@ -524,3 +831,62 @@ class UnionBankTemplateGenerator:
         template = self.generate_csv(batch)
 
         return template, batch
+
+    def create_payroll_templates_bulk(
+        self,
+        jobs: list[tuple[str, list[dict], date | None]],
+        created_by: str = "",
+        max_workers: int | None = None
+    ) -> list[tuple[TransferTemplate, TransferBatch]]:
+        """Create payroll templates for several entities in parallel.
+
+        Each job is independent and CPU-bound (formatting, hashing), so jobs
+        run in a process pool; every worker builds its own generator from
+        this generator's config_dir.
+
+        Args:
+            jobs: List of (entity, payroll_data, transfer_date) tuples
+            created_by: Creator identifier
+            max_workers: Process count (defaults to CPU count)
+
+        Returns:
+            List of (TransferTemplate, TransferBatch) in job order
+        """
+        if len(jobs) <= 1:
+            return [
+                self.create_payroll_template(
+                    entity, payroll_data, transfer_date, created_by
+                )
+                for entity, payroll_data, transfer_date in jobs
+            ]
+
+        workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _create_payroll_template_job,
+                    self.config_dir,
+                    self.source_account,
+                    entity,
+                    payroll_data,
+                    transfer_date,
+                    created_by,
+                )
+                for entity, payroll_data, transfer_date in jobs
+            ]
+            return [future.result() for future in futures]
+
+
+def _create_payroll_template_job(
+    config_dir: Path,
+    source_account: str | None,
+    entity: str,
+    payroll_data: list[dict],
+    transfer_date: date | None,
+    created_by: str
+) -> tuple[TransferTemplate, TransferBatch]:
+    """Process pool worker for create_payroll_templates_bulk."""
+    generator = UnionBankTemplateGenerator(config_dir, source_account)
+    return generator.create_payroll_template(
+        entity, payroll_data, transfer_date, created_by
+    )
@@ -0,0 +1,24 @@
+"""
+Decimal Helpers
+
+Conversions shared by the budget modules.
+"""
+
+from decimal import Decimal
+from typing import Any
+
+
+def to_decimal(value: Any) -> Decimal:
+    """Convert an amount to Decimal, skipping the str() detour where possible.
+
+    Args:
+        value: Decimal, int, float or numeric string
+
+    Returns:
+        Decimal value (floats keep their shortest repr)
+    """
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, int):
+        return Decimal(value)
+    return Decimal(str(value))
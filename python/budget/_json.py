@@ -0,0 +1,41 @@
+"""
+JSON Serialization Helpers
+
+Uses orjson when it is installed and falls back to the stdlib json module.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to stdlib json
+    orjson = None
+
+
+def dumps(data: Any) -> bytes:
+    """Serialize data as compact UTF-8 JSON.
+
+    Args:
+        data: JSON-compatible data (dicts, lists, str, int, float, bool, None)
+
+    Returns:
+        Encoded JSON document
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def dumps_indented(data: Any) -> str:
+    """Serialize data as 2-space indented JSON text.
+
+    Args:
+        data: JSON-compatible data
+
+    Returns:
+        JSON string
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(data, indent=2)
@@ -0,0 +1,52 @@
+"""
+YAML Config Cache
+
+Parses budget config files once per process and re-reads them only when the
+file on disk changes.
+"""
+
+import threading
+from pathlib import Path
+from typing import Any
+
+# path -> ((st_mtime_ns, st_size, st_ino), parsed document)
+_CACHE: dict[Path, tuple[tuple[int, int, int], Any]] = {}
+_LOCK = threading.Lock()
+
+
+def load_yaml_cached(path: Path | str) -> Any:
+    """Load a YAML file, reusing the parsed result while the file is unchanged.
+
+    The returned object is shared between callers and must not be mutated.
+
+    Args:
+        path: Path to the YAML file
+
+    Returns:
+        Parsed YAML document, or None if the file does not exist
+    """
+    path = Path(path)
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    cached = _CACHE.get(path)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    import yaml
+
+    try:
+        from yaml import CSafeLoader as loader
+    except ImportError:  # PyYAML built without libyaml
+        from yaml import SafeLoader as loader
+
+    with open(path) as f:
+        data = yaml.load(f, Loader=loader)
+
+    with _LOCK:
+        _CACHE[path] = (signature, data)
+
+    return data
@@ -6,20 +6,21 @@ Uses Claude AI to analyze historical spending and suggest optimal budgets.
 
 import json
 import logging
-import re
+import time
 from dataclasses import dataclass, field
 from datetime import datetime
 from decimal import Decimal
 from pathlib import Path
 from typing import Any
 
-import anthropic
-import yaml
+from ._decimal import to_decimal
+from ._json import dumps_indented
+from ._yaml_cache import load_yaml_cached
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class BudgetSuggestion:
     """A suggested budget for an account."""
 
@@ -51,7 +52,7 @@ class BudgetSuggestion:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class BudgetAnalysisResult:
     """Result of budget analysis."""
 
@@ -84,6 +85,61 @@ class BudgetAnalysisResult:
         }
 
 
+# Static part of the analysis prompt; sent as a cacheable system block so
+# only the per-entity data varies between calls.
+ANALYSIS_INSTRUCTIONS = """Provide budget recommendations that are:
+1. Realistic based on historical patterns
+2. Adjusted for trends and seasonality
+3. Include a buffer for unexpected expenses (5-10%)
+4. Flag any accounts with high variability
+
+Return ONLY valid JSON:
+{
+  "recommendations": [
+    {
+      "account_code": "string",
+      "account_name": "string",
+      "recommended_budget": 0.00,
+      "change_percent": 0.0,
+      "rationale": "string",
+      "confidence": 0.95,
+      "risk_level": "low|medium|high",
+      "seasonal_factor": 1.0
+    }
+  ],
+  "key_insights": ["insight1", "insight2"],
+  "risks_and_assumptions": ["risk1", "risk2"]
+}"""
+
+
+def _recommend_budget(
+    avg: float, trend: float, volatility: float, uplift: float
+) -> int:
+    """Statistical budget recommendation for one account.
+
+    Args:
+        avg: Historical monthly average
+        trend: Trend ratio from the statistics (positive = increasing)
+        volatility: Coefficient of variation
+        uplift: Combined growth and inflation rate
+
+    Returns:
+        Recommended budget rounded to the nearest 1000
+    """
+    # Apply growth and inflation
+    recommended = avg * (1 + uplift)
+
+    # Apply trend adjustment
+    if trend > 0:
+        recommended *= 1 + min(trend, 0.2)  # Cap at 20%
+
+    # Add buffer based on volatility
+    recommended *= 1 + min(volatility * 0.5, 0.15)  # Cap at 15%
+
+    # Round to nearest 1000
+    return round(recommended / 1000) * 1000
+
+
 class HistoricalAnalyzer:
     """Analyzes historical spending to suggest budgets using Claude AI."""
 
@@ -104,6 +160,10 @@ class HistoricalAnalyzer:
             api_key: Anthropic API key
             model: Claude model to use
         """
+        # Deferred: anthropic pulls in httpx/pydantic, which is most of the
+        # import time of this package
+        import anthropic
+
         self.config_dir = Path(config_dir) if config_dir else Path(__file__).parent.parent.parent / "config"
         self.client = anthropic.Anthropic(api_key=api_key)
         self.model = model or self.DEFAULT_MODEL
@@ -111,27 +171,22 @@ class HistoricalAnalyzer:
 
     def _load_config(self) -> None:
         """Load configuration."""
-        config_file = self.config_dir / "budget_thresholds.yaml"
-        if config_file.exists():
-            with open(config_file) as f:
-                config = yaml.safe_load(f)
-                self.lookback_months = config.get("budget_suggestions", {}).get(
-                    "lookback_months", self.DEFAULT_LOOKBACK_MONTHS
-                )
-                self.inflation_rate = config.get("budget_suggestions", {}).get(
-                    "inflation_rate", self.DEFAULT_INFLATION_RATE
-                )
+        config = load_yaml_cached(self.config_dir / "budget_thresholds.yaml")
+        if config is not None:
+            self.lookback_months = config.get("budget_suggestions", {}).get(
+                "lookback_months", self.DEFAULT_LOOKBACK_MONTHS
+            )
+            self.inflation_rate = config.get("budget_suggestions", {}).get(
+                "inflation_rate", self.DEFAULT_INFLATION_RATE
+            )
         else:
             self.lookback_months = self.DEFAULT_LOOKBACK_MONTHS
             self.inflation_rate = self.DEFAULT_INFLATION_RATE
 
         # Load entity config for context
-        entity_file = self.config_dir / "entity_config.yaml"
-        if entity_file.exists():
-            with open(entity_file) as f:
-                self.entity_config = yaml.safe_load(f)
-        else:
-            self.entity_config = {}
+        self.entity_config = (
+            load_yaml_cached(self.config_dir / "entity_config.yaml") or {}
+        )
 
     def analyze(
         self,
@@ -155,12 +210,6 @@ class HistoricalAnalyzer:
         Returns:
             BudgetAnalysisResult
         """
-        result = BudgetAnalysisResult(
-            entity=entity,
-            target_period=target_month,
-            analysis_date=datetime.now()
-        )
-
         current_budgets = current_budgets or {}
 
         # Calculate basic statistics first
@@ -175,32 +224,9 @@ class HistoricalAnalyzer:
         # Get Claude's analysis
         try:
             claude_result = self._get_claude_analysis(analysis_data)
-
-            # Process suggestions
-            for suggestion_data in claude_result.get("recommendations", []):
-                account_code = suggestion_data.get("account_code", "")
-                stats = account_stats.get(account_code, {})
-
-                suggestion = BudgetSuggestion(
-                    account_code=account_code,
-                    account_name=suggestion_data.get("account_name", ""),
-                    current_budget=Decimal(str(current_budgets.get(account_code, 0))),
-                    recommended_budget=Decimal(str(suggestion_data.get("recommended_budget", 0))),
-                    change_percent=suggestion_data.get("change_percent", 0),
-                    rationale=suggestion_data.get("rationale", ""),
-                    confidence=suggestion_data.get("confidence", 0.5),
-                    risk_level=suggestion_data.get("risk_level", "medium"),
-                    historical_avg=Decimal(str(stats.get("avg", 0))),
-                    historical_max=Decimal(str(stats.get("max", 0))),
-                    seasonal_factor=suggestion_data.get("seasonal_factor", 1.0)
-                )
-
-                result.suggestions.append(suggestion)
-                result.total_current += suggestion.current_budget
-                result.total_recommended += suggestion.recommended_budget
-
-            result.key_insights = claude_result.get("key_insights", [])
-            result.risks_and_assumptions = claude_result.get("risks_and_assumptions", [])
+            result = self._build_result(
+                entity, target_month, current_budgets, account_stats, claude_result
+            )
 
         except Exception as e:
             logger.error(f"Claude analysis error: {e}")
@@ -212,6 +238,148 @@ class HistoricalAnalyzer:
 
         return result
 
+    def analyze_batch(
+        self,
+        requests: list[dict[str, Any]],
+        poll_interval: float = 30.0
+    ) -> list[BudgetAnalysisResult]:
+        """Analyze several entities/periods in one Message Batches API job.
+
+        Batched requests are billed at a discount and run concurrently on
+        the API side, but results can take minutes (up to 24 hours) to
+        arrive, so this suits scheduled jobs rather than interactive use.
+        Requests that fail in the batch fall back to statistical analysis.
+
+        Args:
+            requests: List of keyword-argument dicts for analyze()
+                (entity, target_month, historical_data and optionally
+                current_budgets, growth_rate, seasonal_notes)
+            poll_interval: Seconds between batch status checks
+
+        Returns:
+            BudgetAnalysisResult per request, in request order
+        """
+        prepared = []
+        batch_requests = []
+        for index, request in enumerate(requests):
+            historical_data = request["historical_data"]
+            current_budgets = request.get("current_budgets") or {}
+            growth_rate = request.get("growth_rate", 0.0)
+            account_stats = self._calculate_statistics(historical_data)
+            analysis_data = self._prepare_analysis_data(
+                request["entity"],
+                request["target_month"],
+                historical_data,
+                current_budgets,
+                account_stats,
+                growth_rate,
+                request.get("seasonal_notes", ""),
+            )
+            prepared.append((request, current_budgets, growth_rate, account_stats))
+            batch_requests.append({
+                "custom_id": f"analysis-{index}",
+                "params": self._message_params(analysis_data)
+            })
+
+        claude_results: dict[int, dict] = {}
+        try:
+            batch = self.client.messages.batches.create(requests=batch_requests)
+            while batch.processing_status != "ended":
+                time.sleep(poll_interval)
+                batch = self.client.messages.batches.retrieve(batch.id)
+
+            for entry in self.client.messages.batches.results(batch.id):
+                index = int(entry.custom_id.rsplit("-", 1)[1])
+                if entry.result.type != "succeeded":
+                    logger.error(
+                        f"Batch analysis {entry.custom_id} {entry.result.type}"
+                    )
+                    continue
+                try:
+                    claude_results[index] = self._parse_response(
+                        entry.result.message.content[0].text
+                    )
+                except ValueError as e:
+                    logger.error(f"Batch analysis {entry.custom_id} parse error: {e}")
+
+        except Exception as e:
+            logger.error(f"Claude batch analysis error: {e}")
+
+        results = []
+        for index, (request, current_budgets, growth_rate, account_stats) in enumerate(
+            prepared
+        ):
+            entity = request["entity"]
+            target_month = request["target_month"]
+            claude_result = claude_results.get(index)
+            if claude_result is not None:
+                # A malformed result only falls back for its own request
+                try:
+                    results.append(
+                        self._build_result(
+                            entity,
+                            target_month,
+                            current_budgets,
+                            account_stats,
+                            claude_result,
+                        )
+                    )
+                    continue
+                except Exception as e:
+                    logger.error(f"Batch analysis analysis-{index} result error: {e}")
+
+            results.append(self._statistical_fallback(
+                entity, target_month, request["historical_data"],
+                current_budgets, account_stats, growth_rate
+            ))
+
+        return results
+
+    def _build_result(
+        self,
+        entity: str,
+        target_month: str,
+        current_budgets: dict[str, Decimal],
+        account_stats: dict[str, dict],
+        claude_result: dict
+    ) -> BudgetAnalysisResult:
+        """Build an analysis result from Claude's recommendations."""
+        result = BudgetAnalysisResult(
+            entity=entity,
+            target_period=target_month,
+            analysis_date=datetime.now()
+        )
+
+        # Process suggestions
+        for suggestion_data in claude_result.get("recommendations", []):
+            account_code = suggestion_data.get("account_code", "")
+            stats = account_stats.get(account_code, {})
+
+            suggestion = BudgetSuggestion(
+                account_code=account_code,
+                account_name=suggestion_data.get("account_name", ""),
+                current_budget=to_decimal(current_budgets.get(account_code, 0)),
+                recommended_budget=to_decimal(
+                    suggestion_data.get("recommended_budget", 0)
+                ),
+                change_percent=suggestion_data.get("change_percent", 0),
+                rationale=suggestion_data.get("rationale", ""),
+                confidence=suggestion_data.get("confidence", 0.5),
+                risk_level=suggestion_data.get("risk_level", "medium"),
+                historical_avg=to_decimal(stats.get("avg", 0)),
+                historical_max=to_decimal(stats.get("max", 0)),
+                seasonal_factor=suggestion_data.get("seasonal_factor", 1.0),
+            )
+
+            result.suggestions.append(suggestion)
+            result.total_current += suggestion.current_budget
+            result.total_recommended += suggestion.recommended_budget
+
+        result.key_insights = claude_result.get("key_insights", [])
+        result.risks_and_assumptions = claude_result.get("risks_and_assumptions", [])
+
+        return result
+
     def _calculate_statistics(
         self,
         historical_data: dict[str, list[dict]]
@@ -227,22 +395,25 @@ class HistoricalAnalyzer:
         stats = {}
 
         for account_code, monthly_data in historical_data.items():
-            amounts = [Decimal(str(m.get("amount", 0))) for m in monthly_data]
+            # Plain floats: every stat ends up as float() in the prompt/JSON,
+            # so Decimal construction per month bought no precision
+            amounts = [float(m.get("amount", 0)) for m in monthly_data]
 
             if amounts:
+                avg = sum(amounts) / len(amounts)
                 stats[account_code] = {
-                    "avg": sum(amounts) / len(amounts),
+                    "avg": avg,
                     "max": max(amounts),
                     "min": min(amounts),
                     "trend": self._calculate_trend(amounts),
-                    "volatility": self._calculate_volatility(amounts),
+                    "volatility": self._calculate_volatility(amounts, avg),
                     "months": len(amounts)
                 }
             else:
                 stats[account_code] = {
-                    "avg": Decimal("0"),
-                    "max": Decimal("0"),
-                    "min": Decimal("0"),
+                    "avg": 0.0,
+                    "max": 0.0,
+                    "min": 0.0,
                     "trend": 0,
                     "volatility": 0,
                     "months": 0
@@ -250,32 +421,37 @@ class HistoricalAnalyzer:
 
         return stats
 
-    def _calculate_trend(self, amounts: list[Decimal]) -> float:
+    def _calculate_trend(self, amounts: list[float]) -> float:
         """Calculate trend (positive = increasing)."""
-        if len(amounts) < 2:
+        n = len(amounts)
+        if n < 2:
             return 0.0
 
         # Simple linear trend
-        first_half = sum(amounts[:len(amounts)//2]) / (len(amounts)//2)
-        second_half = sum(amounts[len(amounts)//2:]) / (len(amounts) - len(amounts)//2)
+        half = n // 2
+        first_half = sum(amounts[:half]) / half
+        second_half = sum(amounts[half:]) / (n - half)
 
         if first_half > 0:
-            return float((second_half - first_half) / first_half)
+            return (second_half - first_half) / first_half
         return 0.0
 
-    def _calculate_volatility(self, amounts: list[Decimal]) -> float:
+    def _calculate_volatility(
+        self, amounts: list[float], avg: float | None = None
+    ) -> float:
         """Calculate coefficient of variation."""
-        if len(amounts) < 2:
+        n = len(amounts)
+        if n < 2:
             return 0.0
 
-        avg = sum(amounts) / len(amounts)
+        if avg is None:
+            avg = sum(amounts) / n
         if avg == 0:
             return 0.0
 
-        variance = sum((a - avg) ** 2 for a in amounts) / len(amounts)
-        std_dev = float(variance) ** 0.5
+        variance = sum((a - avg) ** 2 for a in amounts) / n
 
-        return std_dev / float(avg)
+        return variance ** 0.5 / avg
 
     def _prepare_analysis_data(
         self,
@@ -291,6 +467,24 @@ class HistoricalAnalyzer:
         # Get entity context
         entity_info = self.entity_config.get("entities", {}).get(entity, {})
 
+        history_by_account = {}
+        for code, data in historical_data.items():
+            stats = account_stats.get(code, {})
+            history_by_account[code] = {
+                "name": data[0].get("name", "") if data else "",
+                "history": [
+                    {"month": m.get("month"), "amount": float(m.get("amount", 0))}
+                    for m in data
+                ],
+                "current_budget": float(current_budgets.get(code, 0)),
+                "stats": {
+                    "avg": float(stats.get("avg", 0)),
+                    "max": float(stats.get("max", 0)),
+                    "trend": stats.get("trend", 0),
+                    "volatility": stats.get("volatility", 0)
+                }
+            }
+
         return {
             "entity": entity,
             "entity_type": entity_info.get("industry", "unknown"),
@@ -299,28 +493,11 @@ class HistoricalAnalyzer:
             "growth_rate": growth_rate,
             "inflation_rate": self.inflation_rate,
             "seasonal_notes": seasonal_notes,
-            "historical_data": {
-                code: {
-                    "name": data[0].get("name", "") if data else "",
-                    "history": [
-                        {"month": m.get("month"), "amount": float(m.get("amount", 0))}
-                        for m in data
-                    ],
-                    "current_budget": float(current_budgets.get(code, 0)),
-                    "stats": {
-                        "avg": float(stats.get("avg", 0)),
-                        "max": float(stats.get("max", 0)),
-                        "trend": stats.get("trend", 0),
-                        "volatility": stats.get("volatility", 0)
-                    }
-                }
-                for code, data in historical_data.items()
-                for stats in [account_stats.get(code, {})]
-            }
+            "historical_data": history_by_account
         }
 
-    def _get_claude_analysis(self, data: dict) -> dict:
-        """Get budget analysis from Claude."""
+    def _message_params(self, data: dict) -> dict:
+        """Build Messages API parameters for a budget analysis request."""
         prompt = f"""Analyze historical spending and recommend budgets for {data['entity_name']}.
 
 Target Period: {data['target_month']}
@@ -330,48 +507,35 @@ Inflation Rate: {data['inflation_rate']*100}%
 Seasonal Notes: {data['seasonal_notes'] or 'None provided'}
 
 Historical Spending by Account:
-{json.dumps(data['historical_data'], indent=2)}
+{dumps_indented(data['historical_data'])}"""
 
-Provide budget recommendations that are:
-1. Realistic based on historical patterns
-2. Adjusted for trends and seasonality
-3. Include a buffer for unexpected expenses (5-10%)
-4. Flag any accounts with high variability
-
-Return ONLY valid JSON:
-{{
-  "recommendations": [
-    {{
-      "account_code": "string",
-      "account_name": "string",
-      "recommended_budget": 0.00,
-      "change_percent": 0.0,
-      "rationale": "string",
-      "confidence": 0.95,
-      "risk_level": "low|medium|high",
-      "seasonal_factor": 1.0
-    }}
-  ],
-  "key_insights": ["insight1", "insight2"],
-  "risks_and_assumptions": ["risk1", "risk2"]
-}}"""
-
-        message = self.client.messages.create(
-            model=self.model,
-            max_tokens=4096,
-            messages=[{"role": "user", "content": prompt}]
-        )
-
-        response_text = message.content[0].text
+        return {
+            "model": self.model,
+            "max_tokens": 4096,
+            "system": [{
+                "type": "text",
+                "text": ANALYSIS_INSTRUCTIONS,
+                "cache_control": {"type": "ephemeral"}
+            }],
+            "messages": [{"role": "user", "content": prompt}]
+        }
 
-        # Parse response
+    def _parse_response(self, response_text: str) -> dict:
+        """Parse Claude's JSON reply, tolerating markdown code fences."""
         cleaned = response_text.strip()
-        cleaned = re.sub(r'^```json\s*', '', cleaned)
-        cleaned = re.sub(r'^```\s*', '', cleaned)
-        cleaned = re.sub(r'\s*```$', '', cleaned)
+        if cleaned.startswith("```"):
+            cleaned = cleaned.removeprefix("```json").removeprefix("```").lstrip()
+        if cleaned.endswith("```"):
+            cleaned = cleaned[:-3].rstrip()
 
         return json.loads(cleaned)
 
+    def _get_claude_analysis(self, data: dict) -> dict:
+        """Get budget analysis from Claude."""
+        message = self.client.messages.create(**self._message_params(data))
+
+        return self._parse_response(message.content[0].text)
+
     def _statistical_fallback(
         self,
         entity: str,
@@ -392,24 +556,16 @@ Return ONLY valid JSON:
             stats = account_stats.get(account_code, {})
             current = current_budgets.get(account_code, Decimal("0"))
 
-            # Calculate recommended budget
-            avg = stats.get("avg", Decimal("0"))
-            trend = stats.get("trend", 0)
-
-            # Apply growth and inflation
-            recommended = avg * Decimal(str(1 + growth_rate + self.inflation_rate))
-
-            # Apply trend adjustment
-            if trend > 0:
-                recommended *= Decimal(str(1 + min(trend, 0.2)))  # Cap at 20%
-
-            # Add buffer based on volatility
+            avg = stats.get("avg", 0.0)
             volatility = stats.get("volatility", 0)
-            buffer = Decimal(str(1 + min(volatility * 0.5, 0.15)))  # Cap at 15%
-            recommended *= buffer
-
-            # Round to nearest 1000
-            recommended = Decimal(str(round(float(recommended) / 1000) * 1000))
+            recommended = Decimal(
+                _recommend_budget(
+                    avg,
+                    stats.get("trend", 0),
+                    volatility,
+                    growth_rate + self.inflation_rate,
+                )
+            )
 
             change_pct = float((recommended - current) / current * 100) if current > 0 else 0
 
@@ -422,8 +578,8 @@ Return ONLY valid JSON:
                 rationale=f"Based on {stats.get('months', 0)}-month average with growth/inflation adjustment",
                 confidence=0.6,  # Lower confidence for statistical fallback
                 risk_level="medium" if volatility > 0.3 else "low",
-                historical_avg=avg,
-                historical_max=stats.get("max", Decimal("0"))
+                historical_avg=to_decimal(avg),
+                historical_max=to_decimal(stats.get("max", 0))
             )
 
             result.suggestions.append(suggestion)
@@ -4,23 +4,45 @@ Budget Report Generator Module
 Generates formatted budget reports for various channels (Telegram, Excel, etc).
 """
 
+import asyncio
+import heapq
 import json
 import logging
 from dataclasses import dataclass
+from functools import lru_cache
 from datetime import datetime
 from decimal import Decimal
 from pathlib import Path
 from typing import Any
 
-from openpyxl import Workbook
-from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
-
-from .variance_calculator import VarianceItem, VarianceReport
+from .variance_calculator import STATUSES, VarianceItem, VarianceReport
 from .threshold_checker import ThresholdAlert, ThresholdCheckResult
 from .historical_analyzer import BudgetAnalysisResult, BudgetSuggestion
 
 logger = logging.getLogger(__name__)
 
+# Excel number formats
+MONEY_NUMBER_FORMAT = '₱#,##0.00'
+PERCENT_NUMBER_FORMAT = '0.0%'
+
+
+@lru_cache(maxsize=None)
+def _excel_styles() -> dict[str, Any]:
+    """Shared openpyxl style objects for Excel reports, built on first use."""
+    from openpyxl.styles import Font, PatternFill
+
+    def solid(color: str) -> PatternFill:
+        return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+    return {
+        "title_font": Font(bold=True, size=14),
+        "bold_font": Font(bold=True),
+        "header_fill": solid("1F4E79"),
+        "header_font": Font(bold=True, color="FFFFFF"),
+        # Row fills indexed by VarianceItem.status_code
+        "status_fills": (None, solid("FFF2CC"), solid("FCE4D6"), solid("FFC7CE")),
+    }
+
 
 class BudgetReportGenerator:
     """Generates budget reports in various formats."""
@@ -67,17 +89,29 @@ class BudgetReportGenerator:
         Returns:
             Formatted message string
         """
+        entity_display = report.entity.upper() if report.entity else "ALL ENTITIES"
+        summary = report.summary
+
+        # Clean day: nothing needs attention, send the short form
+        if not include_all and not any(i.status_code for i in report.items):
+            utilization = self.PERCENT_FORMAT.format(
+                summary.get('overall_utilization', 0)
+            )
+            return "\n".join([
+                f"📊 *Budget Status Report*",
+                f"Entity: {entity_display} | Period: {report.period}",
+                f"✅ All accounts within budget ({utilization} utilized)"
+            ])
+
         lines = []
 
         # Header
-        entity_display = report.entity.upper() if report.entity else "ALL ENTITIES"
         lines.append(f"📊 *Budget Status Report*")
         lines.append(f"Entity: {entity_display}")
         lines.append(f"Period: {report.period}")
         lines.append("")
 
         # Summary
-        summary = report.summary
         lines.append("*Summary:*")
         lines.append(f"• Total Budget: {self.CURRENCY_FORMAT.format(summary.get('total_budget', 0))}")
         lines.append(f"• Total Spent: {self.CURRENCY_FORMAT.format(summary.get('total_actual', 0))}")
@@ -92,12 +126,14 @@ class BudgetReportGenerator:
         lines.append("")
 
         # Items needing attention
-        warning_items = [i for i in report.items if i.status in ["warning", "critical", "exceeded"]]
+        warning_items = [i for i in report.items if i.status_code > 0]
 
         if warning_items:
             lines.append("*Items Needing Attention:*")
 
-            for item in sorted(warning_items, key=lambda x: x.utilization_percent, reverse=True)[:max_items]:
+            for item in heapq.nlargest(
+                max_items, warning_items, key=lambda x: x.utilization_percent
+            ):
                 emoji = self.STATUS_EMOJI.get(item.status, "")
                 lines.append(
                     f"{emoji} {item.account_name}: {self.PERCENT_FORMAT.format(item.utilization_percent)} "
@@ -110,11 +146,11 @@ class BudgetReportGenerator:
 
         elif include_all:
             lines.append("*All Accounts:*")
-            for item in sorted(report.items, key=lambda x: x.utilization_percent, reverse=True)[:max_items]:
+            for item in heapq.nlargest(
+                max_items, report.items, key=lambda x: x.utilization_percent
+            ):
                 emoji = self.STATUS_EMOJI.get(item.status, "✅")
                 lines.append(f"{emoji} {item.account_name}: {self.PERCENT_FORMAT.format(item.utilization_percent)}")
-        else:
-            lines.append("✅ All accounts within budget!")
 
         lines.append("")
         lines.append(f"_Generated: {report.generated_at.strftime('%Y-%m-%d %H:%M')}_")
@@ -208,12 +244,15 @@ class BudgetReportGenerator:
         lines.append("")
 
         # Top changes
-        significant = [s for s in result.suggestions if abs(s.change_percent) > 10]
-        significant.sort(key=lambda x: abs(x.change_percent), reverse=True)
+        significant = heapq.nlargest(
+            max_items,
+            (s for s in result.suggestions if abs(s.change_percent) > 10),
+            key=lambda x: abs(x.change_percent)
+        )
 
         if significant:
             lines.append("*Significant Changes:*")
-            for s in significant[:max_items]:
+            for s in significant:
                 emoji = "⬆️" if s.change_percent > 0 else "⬇️"
                 lines.append(
                     f"{emoji} {s.account_name}: {s.change_percent:+.0f}% "
@@ -254,84 +293,161 @@ class BudgetReportGenerator:
         Returns:
             Path to generated file
         """
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.utils import get_column_letter
+
         output_path = Path(output_path)
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Budget Variance"
+        # Write-only mode streams rows to the file instead of holding every
+        # cell in memory; column widths and merges must be set before rows
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Budget Variance")
+
+        styles = _excel_styles()
+        status_fills = styles["status_fills"]
+
+        entity_title = report.entity or 'All Entities'
+        title = f"Budget Variance Report - {entity_title} - {report.period}"
+        headers = ['Entity', 'Account', 'Name', 'Budget', 'Actual', 'Variance', 'Utilization', 'Status']
+        totals = report.summary
+        summary = [
+            ("Total Budget", totals.get('total_budget', 0), MONEY_NUMBER_FORMAT),
+            ("Total Actual", totals.get('total_actual', 0), MONEY_NUMBER_FORMAT),
+            (
+                "Overall Utilization",
+                totals.get('overall_utilization', 0) / 100,
+                PERCENT_NUMBER_FORMAT
+            ),
+        ]
 
-        # Styles
-        header_fill = PatternFill(start_color="1F4E79", end_color="1F4E79", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF")
-        warning_fill = PatternFill(start_color="FFF2CC", end_color="FFF2CC", fill_type="solid")
-        critical_fill = PatternFill(start_color="FCE4D6", end_color="FCE4D6", fill_type="solid")
-        exceeded_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+        # Prepare rows, tracking the widest value per column for auto-fit
+        col_widths = [len(h) for h in headers]
+        col_widths[0] = max(col_widths[0], len(title))
+        rows = []
+        for item in report.items:
+            status_code = item.status_code
+            values = [
+                item.entity,
+                item.account_code,
+                item.account_name,
+                float(item.budget_amount),
+                float(item.actual_amount),
+                float(item.variance_amount),
+                item.utilization_percent / 100,
+                STATUSES[status_code].upper(),
+            ]
+            for col, value in enumerate(values):
+                width = len(str(value))
+                if width > col_widths[col]:
+                    col_widths[col] = width
+            rows.append((values, status_code))
+
+        # Auto-fit columns
+        for col, width in enumerate(col_widths, 1):
+            ws.column_dimensions[get_column_letter(col)].width = min(width + 2, 30)
 
         # Title
-        ws.merge_cells('A1:H1')
-        ws['A1'] = f"Budget Variance Report - {report.entity or 'All Entities'} - {report.period}"
-        ws['A1'].font = Font(bold=True, size=14)
+        ws.merged_cells.add("A1:H1")
+        title_cell = WriteOnlyCell(ws, value=title)
+        title_cell.font = styles["title_font"]
+        ws.append([title_cell])
+        ws.append([])
 
         # Headers
-        headers = ['Entity', 'Account', 'Name', 'Budget', 'Actual', 'Variance', 'Utilization', 'Status']
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=3, column=col, value=header)
-            cell.fill = header_fill
-            cell.font = header_font
-
-        # Data
-        for row_num, item in enumerate(report.items, 4):
-            ws.cell(row=row_num, column=1, value=item.entity)
-            ws.cell(row=row_num, column=2, value=item.account_code)
-            ws.cell(row=row_num, column=3, value=item.account_name)
-            ws.cell(row=row_num, column=4, value=float(item.budget_amount))
-            ws.cell(row=row_num, column=5, value=float(item.actual_amount))
-            ws.cell(row=row_num, column=6, value=float(item.variance_amount))
-            ws.cell(row=row_num, column=7, value=item.utilization_percent / 100)
-            ws.cell(row=row_num, column=8, value=item.status.upper())
+        header_row = []
+        for header in headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.fill = styles["header_fill"]
+            cell.font = styles["header_font"]
+            header_row.append(cell)
+        ws.append(header_row)
+
+        # Data: one pre-styled row of cells per status. Write-only rows are
+        # serialized on append, so the same cells are refilled for each row
+        # instead of resolving number formats and fills per cell.
+        row_templates = []
+        for fill in status_fills:
+            cells = [WriteOnlyCell(ws) for _ in headers]
 
             # Format currency columns
-            for col in [4, 5, 6]:
-                ws.cell(row=row_num, column=col).number_format = '₱#,##0.00'
-            ws.cell(row=row_num, column=7).number_format = '0.0%'
+            for cell in cells[3:6]:
+                cell.number_format = MONEY_NUMBER_FORMAT
+            cells[6].number_format = PERCENT_NUMBER_FORMAT
 
             # Conditional formatting
-            if item.status == "exceeded":
-                for col in range(1, 9):
-                    ws.cell(row=row_num, column=col).fill = exceeded_fill
-            elif item.status == "critical":
-                for col in range(1, 9):
-                    ws.cell(row=row_num, column=col).fill = critical_fill
-            elif item.status == "warning":
-                for col in range(1, 9):
-                    ws.cell(row=row_num, column=col).fill = warning_fill
+            if fill is not None:
+                for cell in cells:
+                    cell.fill = fill
 
-        # Auto-fit columns
-        for col in ws.columns:
-            max_length = max(len(str(cell.value or "")) for cell in col)
-            ws.column_dimensions[col[0].column_letter].width = min(max_length + 2, 30)
-
-        # Summary section
-        summary_row = len(report.items) + 6
-        ws.cell(row=summary_row, column=1, value="Summary")
-        ws.cell(row=summary_row, column=1).font = Font(bold=True)
+            row_templates.append(cells)
 
-        ws.cell(row=summary_row + 1, column=1, value="Total Budget")
-        ws.cell(row=summary_row + 1, column=2, value=report.summary.get('total_budget', 0))
-        ws.cell(row=summary_row + 1, column=2).number_format = '₱#,##0.00'
+        for values, status_code in rows:
+            cells = row_templates[status_code]
+            for cell, value in zip(cells, values):
+                cell.value = value
+            ws.append(cells)
 
-        ws.cell(row=summary_row + 2, column=1, value="Total Actual")
-        ws.cell(row=summary_row + 2, column=2, value=report.summary.get('total_actual', 0))
-        ws.cell(row=summary_row + 2, column=2).number_format = '₱#,##0.00'
+        # Summary section
+        ws.append([])
+        ws.append([])
+        summary_cell = WriteOnlyCell(ws, value="Summary")
+        summary_cell.font = styles["bold_font"]
+        ws.append([summary_cell])
 
-        ws.cell(row=summary_row + 3, column=1, value="Overall Utilization")
-        ws.cell(row=summary_row + 3, column=2, value=report.summary.get('overall_utilization', 0) / 100)
-        ws.cell(row=summary_row + 3, column=2).number_format = '0.0%'
+        for label, value, number_format in summary:
+            cell = WriteOnlyCell(ws, value=value)
+            cell.number_format = number_format
+            ws.append([label, cell])
 
         output_path.parent.mkdir(parents=True, exist_ok=True)
         wb.save(output_path)
 
         return output_path
 
+    async def generate_variance_excel_async(
+        self,
+        report: VarianceReport,
+        output_path: Path | str
+    ) -> Path:
+        """Generate Excel variance report in a worker thread.
+
+        Args:
+            report: VarianceReport to export
+            output_path: Output file path
+
+        Returns:
+            Path to generated file
+        """
+        return await asyncio.to_thread(
+            self.generate_variance_excel, report, output_path
+        )
+
+    async def generate_variance_excels(
+        self,
+        jobs: list[tuple[VarianceReport, Path | str]],
+        max_concurrency: int = 4
+    ) -> list[Path]:
+        """Generate several Excel variance reports concurrently.
+
+        Saving (zip compression and disk writes) of one report overlaps with
+        row construction of the next; row construction itself still holds
+        the GIL.
+
+        Args:
+            jobs: List of (report, output_path) pairs
+            max_concurrency: Maximum reports generated at once
+
+        Returns:
+            Paths to generated files, in job order
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(report: VarianceReport, output_path: Path | str) -> Path:
+            async with semaphore:
+                return await self.generate_variance_excel_async(report, output_path)
+
+        return list(await asyncio.gather(*(run(report, path) for report, path in jobs)))
+
     def format_daily_digest(
         self,
         entity: str,
@@ -5,20 +5,21 @@ Monitors budget utilization and triggers alerts when thresholds are breached.
 """
 
 import logging
+import time
 from dataclasses import dataclass, field
 from datetime import datetime
 from decimal import Decimal
 from pathlib import Path
 from typing import Any
 
-import yaml
-
+from ._json import dumps
+from ._yaml_cache import load_yaml_cached
 from .variance_calculator import VarianceItem, VarianceReport
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class ThresholdAlert:
     """Alert triggered when a threshold is breached."""
 
@@ -59,7 +60,7 @@ class ThresholdAlert:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ThresholdCheckResult:
     """Result of threshold checking."""
 
@@ -72,6 +73,21 @@ class ThresholdCheckResult:
     def has_critical_alerts(self) -> bool:
         return any(a.severity in ["high", "medium"] for a in self.alerts)
 
+    def to_dict(self) -> dict:
+        return {
+            "alerts": [a.to_dict() for a in self.alerts],
+            "checked_count": self.checked_count,
+            "alert_count": self.alert_count,
+            # Alerts are listed once above; only the per-severity counts here
+            "by_severity": {
+                severity: len(alerts) for severity, alerts in self.by_severity.items()
+            },
+        }
+
+    def to_json(self) -> bytes:
+        """Serialize the result as UTF-8 JSON (same shape as to_dict)."""
+        return dumps(self.to_dict())
+
 
 class ThresholdChecker:
     """Checks budget thresholds and generates alerts."""
@@ -84,23 +100,23 @@ class ThresholdChecker:
         """
         self.config_dir = Path(config_dir) if config_dir else Path(__file__).parent.parent.parent / "config"
         self._load_config()
-        self._alert_history: dict[str, datetime] = {}  # Track sent alerts
+        # (entity, account_code, threshold_type) -> last alert time (epoch seconds)
+        self._alert_history: dict[tuple[str, str, str], float] = {}
 
     def _load_config(self) -> None:
         """Load threshold configuration."""
-        config_file = self.config_dir / "budget_thresholds.yaml"
-
-        if config_file.exists():
-            with open(config_file) as f:
-                self.config = yaml.safe_load(f)
-        else:
-            self.config = self._default_config()
+        config = load_yaml_cached(self.config_dir / "budget_thresholds.yaml")
+        self.config = config if config is not None else self._default_config()
 
         # Parse thresholds
         self.thresholds = self.config.get("thresholds", {})
         self.account_overrides = self.config.get("account_overrides", {})
         self.entity_overrides = self.config.get("entity_overrides", {})
         self.cooldown_hours = self.config.get("cooldown", {}).get("same_threshold_hours", 24)
+        self._cooldown_seconds = self.cooldown_hours * 3600
+
+        # (entity, account_code) -> (warning, critical, exceeded) percentages
+        self._threshold_cache: dict[tuple[str, str], tuple[int, int, int]] = {}
 
     def _default_config(self) -> dict:
         """Get default configuration."""
@@ -146,11 +162,14 @@ class ThresholdChecker:
         # Use global default
         return self.thresholds.get(threshold_type, {}).get("percentage", 100)
 
-    def check_variance(self, item: VarianceItem) -> ThresholdAlert | None:
+    def check_variance(
+        self, item: VarianceItem, now_ts: float | None = None
+    ) -> ThresholdAlert | None:
         """Check a single variance item against thresholds.
 
         Args:
             item: VarianceItem to check
+            now_ts: Current time as epoch seconds (defaults to time.time())
 
         Returns:
             ThresholdAlert if threshold breached, None otherwise
@@ -158,15 +177,21 @@ class ThresholdChecker:
         utilization = item.utilization_percent
 
         # Get thresholds for this account
-        warning_threshold = self.get_threshold_for_account(
-            item.account_code, item.entity, "warning"
-        )
-        critical_threshold = self.get_threshold_for_account(
-            item.account_code, item.entity, "critical"
-        )
-        exceeded_threshold = self.get_threshold_for_account(
-            item.account_code, item.entity, "exceeded"
-        )
+        key = (item.entity, item.account_code)
+        thresholds = self._threshold_cache.get(key)
+        if thresholds is None:
+            thresholds = self._threshold_cache[key] = (
+                self.get_threshold_for_account(
+                    item.account_code, item.entity, "warning"
+                ),
+                self.get_threshold_for_account(
+                    item.account_code, item.entity, "critical"
+                ),
+                self.get_threshold_for_account(
+                    item.account_code, item.entity, "exceeded"
+                ),
+            )
+        warning_threshold, critical_threshold, exceeded_threshold = thresholds
 
         # Determine which threshold was breached (highest first)
         threshold_type = None
@@ -186,12 +211,12 @@ class ThresholdChecker:
             return None
 
         # Check cooldown
-        alert_key = f"{item.entity}_{item.account_code}_{threshold_type}"
-        if alert_key in self._alert_history:
-            last_alert = self._alert_history[alert_key]
-            hours_since = (datetime.now() - last_alert).total_seconds() / 3600
-            if hours_since < self.cooldown_hours:
-                return None  # Still in cooldown
+        if now_ts is None:
+            now_ts = time.time()
+        alert_key = (item.entity, item.account_code, threshold_type)
+        last_alert = self._alert_history.get(alert_key)
+        if last_alert is not None and now_ts - last_alert < self._cooldown_seconds:
+            return None  # Still in cooldown
 
         # Create alert
         message = self._format_alert_message(
@@ -207,11 +232,12 @@ class ThresholdChecker:
             actual_percent=utilization,
             actual_amount=item.actual_amount,
             budget_amount=item.budget_amount,
+            triggered_at=datetime.fromtimestamp(now_ts),
             message=message
         )
 
         # Record alert time
-        self._alert_history[alert_key] = datetime.now()
+        self._alert_history[alert_key] = now_ts
 
         return alert
 
@@ -225,20 +251,23 @@ class ThresholdChecker:
             ThresholdCheckResult
         """
         result = ThresholdCheckResult(checked_count=len(report.items))
+        now_ts = time.time()
+
+        # Group by severity as alerts are produced
+        by_severity: dict[str, list[ThresholdAlert]] = {
+            "high": [],
+            "medium": [],
+            "low": [],
+        }
 
         for item in report.items:
-            alert = self.check_variance(item)
+            alert = self.check_variance(item, now_ts)
             if alert:
                 result.alerts.append(alert)
+                by_severity[alert.severity].append(alert)
 
         result.alert_count = len(result.alerts)
-
-        # Group by severity
-        result.by_severity = {
-            "high": [a for a in result.alerts if a.severity == "high"],
-            "medium": [a for a in result.alerts if a.severity == "medium"],
-            "low": [a for a in result.alerts if a.severity == "low"]
-        }
+        result.by_severity = by_severity
 
         return result
 
@@ -312,12 +341,11 @@ class ThresholdChecker:
         if entity is None and account_code is None:
             self._alert_history.clear()
         else:
-            keys_to_remove = []
-            for key in self._alert_history:
-                parts = key.split("_")
-                if entity and parts[0] == entity:
-                    if account_code is None or parts[1] == account_code:
-                        keys_to_remove.append(key)
+            keys_to_remove = [
+                key for key in self._alert_history
+                if (entity is None or key[0] == entity)
+                and (account_code is None or key[1] == account_code)
+            ]
             for key in keys_to_remove:
                 del self._alert_history[key]
 
@@ -4,19 +4,33 @@ Budget Variance Calculator Module
 Calculates budget vs actual variances for all accounts and entities.
 """
 
+import calendar
+import heapq
 import logging
 from dataclasses import dataclass, field
 from datetime import datetime
 from decimal import Decimal
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
-import yaml
+from ._decimal import to_decimal
+from ._json import dumps
+from ._yaml_cache import load_yaml_cached
 
 logger = logging.getLogger(__name__)
 
+# Variance statuses in order of severity, indexed by VarianceItem.status_code
+STATUSES = ("ok", "warning", "critical", "exceeded")
 
-@dataclass
+
+@lru_cache(maxsize=256)
+def _days_in_month(year: int, month: int) -> int:
+    """Get the number of days in a calendar month."""
+    return calendar.monthrange(year, month)[1]
+
+
+@dataclass(slots=True)
 class VarianceItem:
     """Single variance calculation result."""
 
@@ -32,18 +46,21 @@ class VarianceItem:
     is_over_budget: bool
     days_remaining: int = 0
     projected_month_end: Decimal | None = None
+    # Derived from utilization_percent once at construction
+    status_code: int = field(init=False, compare=False)  # index into STATUSES
+    status: str = field(init=False, compare=False)
 
-    @property
-    def status(self) -> str:
-        """Get status string based on utilization."""
+    def __post_init__(self) -> None:
         if self.utilization_percent >= 100:
-            return "exceeded"
+            status_code = 3
         elif self.utilization_percent >= 90:
-            return "critical"
+            status_code = 2
         elif self.utilization_percent >= 70:
-            return "warning"
+            status_code = 1
         else:
-            return "ok"
+            status_code = 0
+        self.status_code = status_code
+        self.status = STATUSES[status_code]
 
     def to_dict(self) -> dict:
         return {
@@ -63,7 +80,7 @@ class VarianceItem:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class VarianceReport:
     """Complete variance report for an entity or period."""
 
@@ -79,7 +96,7 @@ class VarianceReport:
 
     @property
     def warning_items(self) -> list[VarianceItem]:
-        return [i for i in self.items if i.status in ["warning", "critical"]]
+        return [i for i in self.items if i.status_code in (1, 2)]
 
     def to_dict(self) -> dict:
         return {
@@ -90,6 +107,10 @@ class VarianceReport:
             "summary": self.summary
         }
 
+    def to_json(self) -> bytes:
+        """Serialize the report as UTF-8 JSON (same shape as to_dict)."""
+        return dumps(self.to_dict())
+
 
 class VarianceCalculator:
     """Calculates budget variances."""
@@ -105,10 +126,9 @@ class VarianceCalculator:
 
     def _load_config(self) -> None:
         """Load configuration."""
-        thresholds_file = self.config_dir / "budget_thresholds.yaml"
-        if thresholds_file.exists():
-            with open(thresholds_file) as f:
-                self.config = yaml.safe_load(f)
+        config = load_yaml_cached(self.config_dir / "budget_thresholds.yaml")
+        if config is not None:
+            self.config = config
         else:
             self.config = {
                 "thresholds": {
@@ -144,17 +164,25 @@ class VarianceCalculator:
         Returns:
             VarianceItem
         """
-        # Calculate basic variance
+        # Calculate basic variance. Ratios stay in Decimal so accounts sitting
+        # exactly on a threshold (e.g. 90.00%) are not nudged below it by
+        # binary float rounding; (actual - budget) / budget == utilization - 100.
         variance = budget - actual
-        variance_pct = float((actual - budget) / budget * 100) if budget > 0 else 0
-        utilization = float(actual / budget * 100) if budget > 0 else 0
+        if budget > 0:
+            utilization_dec = actual / budget * 100
+            utilization = float(utilization_dec)
+            variance_pct = float(utilization_dec - 100)
+        else:
+            utilization = variance_pct = 0
 
         # Calculate projected month-end
         days_remaining = max(0, days_in_month - days_elapsed)
         projected = None
         if days_elapsed > 0:
-            daily_rate = actual / days_elapsed
-            projected = actual + (daily_rate * days_remaining)
+            projected = actual
+            if days_remaining:
+                daily_rate = actual / days_elapsed
+                projected = actual + (daily_rate * days_remaining)
 
         return VarianceItem(
             entity=entity,
@@ -200,20 +228,27 @@ class VarianceCalculator:
         now = datetime.now()
 
         # Calculate days in month and elapsed
+        days_in_month = _days_in_month(year, month)
         if year == now.year and month == now.month:
             days_elapsed = now.day
         else:
             # Past month - full month
-            import calendar
-            days_elapsed = calendar.monthrange(year, month)[1]
+            days_elapsed = days_in_month
 
-        days_in_month = 30  # Simplified
-
-        # Index actual data by entity and account
-        actual_index = {}
+        # Index actual data by entity and account, summing split records
+        actual_index: dict[tuple[str, str], Decimal] = {}
         for record in actual_data:
-            key = (record.get("entity"), record.get("account_code"))
-            actual_index[key] = Decimal(str(record.get("total_amount", 0)))
+            record_entity = record.get("entity")
+            if entity and record_entity != entity:
+                continue
+            key = (record_entity, record.get("account_code"))
+            amount = to_decimal(record.get("total_amount", 0))
+            actual_index[key] = actual_index.get(key, 0) + amount
+
+        # Summary totals, accumulated in the same pass
+        total_budget = Decimal("0")
+        total_actual = Decimal("0")
+        over_count = warning_count = ok_count = 0
 
         # Calculate variance for each budget item
         for budget_record in budget_data:
@@ -224,7 +259,7 @@ class VarianceCalculator:
             if entity and record_entity != entity:
                 continue
 
-            budget_amount = Decimal(str(budget_record.get("budget_amount", 0)))
+            budget_amount = to_decimal(budget_record.get("budget_amount", 0))
             actual_amount = actual_index.get((record_entity, account_code), Decimal("0"))
 
             item = self.calculate_variance(
@@ -240,18 +275,26 @@ class VarianceCalculator:
 
             report.items.append(item)
 
+            total_budget += budget_amount
+            total_actual += actual_amount
+            if item.is_over_budget:
+                over_count += 1
+            status_code = item.status_code
+            if status_code == 0:
+                ok_count += 1
+            elif status_code < 3:
+                warning_count += 1
+
         # Calculate summary
-        total_budget = sum(i.budget_amount for i in report.items)
-        total_actual = sum(i.actual_amount for i in report.items)
 
         report.summary = {
             "total_budget": float(total_budget),
             "total_actual": float(total_actual),
             "total_variance": float(total_budget - total_actual),
             "overall_utilization": float(total_actual / total_budget * 100) if total_budget > 0 else 0,
-            "accounts_over_budget": len(report.over_budget_items),
-            "accounts_warning": len(report.warning_items),
-            "accounts_ok": len([i for i in report.items if i.status == "ok"]),
+            "accounts_over_budget": over_count,
+            "accounts_warning": warning_count,
+            "accounts_ok": ok_count,
         }
 
         return report
@@ -277,14 +320,8 @@ class VarianceCalculator:
         if only_over_budget:
             items = [i for i in items if i.is_over_budget]
 
-        # Sort by absolute variance percentage
-        sorted_items = sorted(
-            items,
-            key=lambda x: abs(x.variance_percent),
-            reverse=True
-        )
-
-        return sorted_items[:limit]
+        # Top items by absolute variance percentage
+        return heapq.nlargest(limit, items, key=lambda x: abs(x.variance_percent))
 
     def compare_periods(
         self,
@@ -304,40 +341,45 @@ class VarianceCalculator:
         items1 = {i.account_code: i for i in report1.items}
         items2 = {i.account_code: i for i in report2.items}
 
+        improved: list[dict] = []  # Better utilization
+        worsened: list[dict] = []  # Worse utilization
+        new_issues: list[dict] = []  # New over-budget items
+        resolved: list[dict] = []  # Previously over, now ok
+
+        # Only accounts present in both periods can be compared, so walk the
+        # later report and join against the earlier one
+        for account, item2 in items2.items():
+            item1 = items1.get(account)
+            if item1 is None:
+                continue
+
+            util_change = item2.utilization_percent - item1.utilization_percent
+
+            if util_change < -5:  # 5% improvement
+                improved.append({
+                    "account": account,
+                    "name": item2.account_name,
+                    "change": util_change
+                })
+            elif util_change > 5:  # 5% worsening
+                worsened.append({
+                    "account": account,
+                    "name": item2.account_name,
+                    "change": util_change
+                })
+
+            if not item1.is_over_budget and item2.is_over_budget:
+                new_issues.append(item2.to_dict())
+            elif item1.is_over_budget and not item2.is_over_budget:
+                resolved.append(item2.to_dict())
+
         comparison = {
             "period1": report1.period,
             "period2": report2.period,
-            "improved": [],  # Better utilization
-            "worsened": [],  # Worse utilization
-            "new_issues": [],  # New over-budget items
-            "resolved": [],  # Previously over, now ok
+            "improved": improved,
+            "worsened": worsened,
+            "new_issues": new_issues,
+            "resolved": resolved,
         }
 
-        all_accounts = set(items1.keys()) | set(items2.keys())
-
-        for account in all_accounts:
-            item1 = items1.get(account)
-            item2 = items2.get(account)
-
-            if item1 and item2:
-                util_change = item2.utilization_percent - item1.utilization_percent
-
-                if util_change < -5:  # 5% improvement
-                    comparison["improved"].append({
-                        "account": account,
-                        "name": item2.account_name,
-                        "change": util_change
-                    })
-                elif util_change > 5:  # 5% worsening
-                    comparison["worsened"].append({
-                        "account": account,
-                        "name": item2.account_name,
-                        "change": util_change
-                    })
-
-                if not item1.is_over_budget and item2.is_over_budget:
-                    comparison["new_issues"].append(item2.to_dict())
-                elif item1.is_over_budget and not item2.is_over_budget:
-                    comparison["resolved"].append(item2.to_dict())
-
         return comparison
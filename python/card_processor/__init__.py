@@ -5,19 +5,53 @@ Handles CSV/PDF parsing, Claude-based categorization, and duplicate detection
 for credit card statements.
 """
 
-from .categorizer import TransactionCategorizer, Classification, CategorizationResult
-from .duplicate_detector import DuplicateDetector, DuplicateMatch, DeduplicationResult
-from .merchant_lookup import MerchantLookup, MerchantMatch
-from .pdf_extractor import PDFExtractor, PDFExtractionResult
-from .csv_parsers import (
-    ParsedTransaction,
-    ParseResult,
-    UnionBankParser,
-    BDOParser,
-    GCashParser,
-    GenericParser,
-    detect_and_parse,
-)
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .categorizer import (
+        TransactionCategorizer,
+        Classification,
+        CategorizationResult,
+    )
+    from .duplicate_detector import (
+        DuplicateDetector,
+        DuplicateMatch,
+        DeduplicationResult,
+    )
+    from .merchant_lookup import MerchantLookup, MerchantMatch
+    from .pdf_extractor import PDFExtractor, PDFExtractionResult
+    from .csv_parsers import (
+        ParsedTransaction,
+        ParseResult,
+        UnionBankParser,
+        BDOParser,
+        GCashParser,
+        GenericParser,
+        detect_and_parse,
+    )
+
+# Public name -> submodule. Submodules are imported on first attribute access
+# so that e.g. the CSV parsers can be used without loading the Claude client.
+_LAZY = {
+    "TransactionCategorizer": ".categorizer",
+    "Classification": ".categorizer",
+    "CategorizationResult": ".categorizer",
+    "DuplicateDetector": ".duplicate_detector",
+    "DuplicateMatch": ".duplicate_detector",
+    "DeduplicationResult": ".duplicate_detector",
+    "MerchantLookup": ".merchant_lookup",
+    "MerchantMatch": ".merchant_lookup",
+    "PDFExtractor": ".pdf_extractor",
+    "PDFExtractionResult": ".pdf_extractor",
+    "ParsedTransaction": ".csv_parsers",
+    "ParseResult": ".csv_parsers",
+    "UnionBankParser": ".csv_parsers",
+    "BDOParser": ".csv_parsers",
+    "GCashParser": ".csv_parsers",
+    "GenericParser": ".csv_parsers",
+    "detect_and_parse": ".csv_parsers",
+}
 
 __all__ = [
     # Categorization
@@ -43,3 +77,16 @@ __all__ = [
     "GenericParser",
     "detect_and_parse",
 ]
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
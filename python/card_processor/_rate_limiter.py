@@ -0,0 +1,114 @@
+"""
+Client-side Rate Limiter
+
+Token-bucket limiter that spaces out Claude requests before they are sent,
+so bursts are delayed locally instead of being rejected with HTTP 429.
+"""
+
+import asyncio
+import threading
+import time
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute token buckets.
+
+    Both buckets start full and refill continuously. A caller that would
+    overdraw either bucket is told how long to wait; the reservation is taken
+    immediately so concurrent callers queue up behind it.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int | None = None,
+        tokens_per_minute: int | None = None
+    ):
+        """Initialize the limiter.
+
+        Args:
+            requests_per_minute: Request budget (None for no request limit)
+            tokens_per_minute: Input token budget (None for no token limit)
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: int = 0) -> float:
+        """Reserve capacity for one request.
+
+        Args:
+            tokens: Estimated input tokens for the request
+
+        Returns:
+            Seconds the caller must wait before sending
+        """
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._updated = now
+            wait = 0.0
+
+            if self.requests_per_minute:
+                rate = self.requests_per_minute / 60
+                self._requests = (
+                    min(self.requests_per_minute, self._requests + elapsed * rate) - 1
+                )
+                if self._requests < 0:
+                    wait = -self._requests / rate
+
+            if self.tokens_per_minute:
+                rate = self.tokens_per_minute / 60
+                # A request larger than the whole bucket waits for a full bucket
+                tokens = min(tokens, self.tokens_per_minute)
+                self._tokens = (
+                    min(self.tokens_per_minute, self._tokens + elapsed * rate) - tokens
+                )
+                if self._tokens < 0:
+                    wait = max(wait, -self._tokens / rate)
+
+            return wait
+
+    def acquire(self, tokens: int = 0) -> None:
+        """Block until a request of the given size may be sent."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int = 0) -> None:
+        """Wait without blocking the event loop until a request may be sent."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def retry_after_seconds(
+    error: Exception, attempt: int, max_wait: float = 60.0
+) -> float:
+    """Seconds to wait before retrying a rate-limited request.
+
+    Uses the server's retry-after header when present, otherwise exponential
+    backoff (1, 2, 4, ... seconds).
+
+    Args:
+        error: The rate limit error (an anthropic.APIStatusError)
+        attempt: Zero-based retry attempt
+        max_wait: Upper bound on the returned wait
+
+    Returns:
+        Seconds to wait
+    """
+    response = getattr(error, "response", None)
+    header = response.headers.get("retry-after") if response is not None else None
+    try:
+        wait = float(header)
+    except (TypeError, ValueError):
+        wait = 2.0 ** attempt
+    return min(max(wait, 0.0), max_wait)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough input token estimate (about 4 characters per token)."""
+    return len(text) // 4 + 1
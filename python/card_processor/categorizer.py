@@ -4,9 +4,11 @@ Transaction Categorizer Module
 Categorizes transactions using merchant lookup first, then Claude API for unknowns.
 """
 
+import asyncio
+import heapq
 import json
 import logging
-import re
+import time
 from dataclasses import dataclass, field
 from datetime import datetime
 from decimal import Decimal
@@ -16,13 +18,33 @@ from typing import Any
 import anthropic
 import yaml
 
+try:
+    import orjson
+except ImportError:  # optional, falls back to stdlib json
+    orjson = None
+
+from ._rate_limiter import RateLimiter, estimate_tokens, retry_after_seconds
 from .csv_parsers.base import ParsedTransaction
 from .merchant_lookup import MerchantLookup, MerchantMatch
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+def _dumps_indented(data: Any) -> str:
+    """Serialize data as 2-space indented JSON for the prompt."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(data, indent=2)
+
+
+def _loads(text: str) -> Any:
+    """Parse a JSON response."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+@dataclass(slots=True)
 class Classification:
     """Transaction classification result."""
 
@@ -46,7 +68,7 @@ class Classification:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ClassifiedTransaction:
     """A transaction with its classification."""
 
@@ -54,7 +76,7 @@ class ClassifiedTransaction:
     classification: Classification | None
 
 
-@dataclass
+@dataclass(slots=True)
 class CategorizationResult:
     """Result of batch categorization."""
 
@@ -68,12 +90,17 @@ class TransactionCategorizer:
 
     DEFAULT_MODEL = "claude-sonnet-4-5-20250929"
 
+    # Extra attempts after a 429, waiting for the server's retry-after each time
+    RATE_LIMIT_RETRIES = 3
+
     def __init__(
         self,
         config_dir: Path | str | None = None,
         api_key: str | None = None,
         model: str | None = None,
-        use_claude: bool = True
+        use_claude: bool = True,
+        requests_per_minute: int | None = None,
+        tokens_per_minute: int | None = None
     ):
         """Initialize the categorizer.
 
@@ -82,6 +109,8 @@ class TransactionCategorizer:
             api_key: Anthropic API key
             model: Claude model to use
             use_claude: Whether to use Claude for unknown transactions
+            requests_per_minute: Client-side Claude request limit (None for no limit)
+            tokens_per_minute: Client-side Claude input token limit (None for no limit)
         """
         self.config_dir = Path(config_dir) if config_dir else Path(__file__).parent.parent.parent / "config"
         self.merchant_lookup = MerchantLookup(self.config_dir)
@@ -90,8 +119,15 @@ class TransactionCategorizer:
 
         if use_claude:
             self.client = anthropic.Anthropic(api_key=api_key)
+            self.async_client = anthropic.AsyncAnthropic(api_key=api_key)
         else:
             self.client = None
+            self.async_client = None
+
+        if requests_per_minute or tokens_per_minute:
+            self.rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        else:
+            self.rate_limiter = None
 
         self._load_config()
 
@@ -105,6 +141,9 @@ class TransactionCategorizer:
         else:
             self.chart_of_accounts = {}
 
+        # Rendered once; the chart is embedded in every Claude prompt
+        self._coa_str = yaml.dump(self.chart_of_accounts, default_flow_style=False)
+
         # Load prompts
         prompts_dir = self.config_dir.parent / "prompts"
         prompt_file = prompts_dir / "classify_transaction.md"
@@ -168,14 +207,182 @@ class TransactionCategorizer:
         Returns:
             CategorizationResult
         """
+        # 1. First pass: try merchant lookup
+        result, pending_claude = self._classify_by_lookup(transactions, entity)
+
+        # 2. Second pass: use Claude for remaining
+        if pending_claude and self.use_claude and self.client:
+            # Process in batches
+            for i in range(0, len(pending_claude), batch_size):
+                batch = pending_claude[i:i + batch_size]
+                classifications = self._classify_with_claude(batch, entity)
+                self._collect_claude_results(result, batch, classifications)
+        else:
+            result.unclassified.extend(pending_claude)
+
+        self._calculate_stats(result, len(transactions))
+
+        return result
+
+    async def classify_batch_async(
+        self,
+        transactions: list[ParsedTransaction],
+        entity: str | None = None,
+        batch_size: int = 30,
+        max_concurrency: int = 4
+    ) -> CategorizationResult:
+        """Classify a batch of transactions, sending Claude batches concurrently.
+
+        Same result as classify_batch, but the Claude round-trips for all
+        batches overlap instead of running one after another.
+
+        Args:
+            transactions: Transactions to classify
+            entity: Entity context
+            batch_size: Batch size for Claude API calls
+            max_concurrency: Maximum Claude requests in flight at once
+
+        Returns:
+            CategorizationResult
+        """
+        # 1. First pass: try merchant lookup
+        result, pending_claude = self._classify_by_lookup(transactions, entity)
+
+        # 2. Second pass: all Claude batches in flight together
+        if pending_claude and self.use_claude and self.async_client:
+            batches = [
+                pending_claude[i:i + batch_size]
+                for i in range(0, len(pending_claude), batch_size)
+            ]
+            semaphore = asyncio.Semaphore(max_concurrency)
+
+            async def run(
+                batch: list[ParsedTransaction],
+            ) -> list[Classification | None]:
+                async with semaphore:
+                    return await self._classify_with_claude_async(batch, entity)
+
+            all_classifications = await asyncio.gather(
+                *(run(batch) for batch in batches)
+            )
+
+            # gather preserves order, so results line up with the sync path
+            for batch, classifications in zip(batches, all_classifications):
+                self._collect_claude_results(result, batch, classifications)
+        else:
+            result.unclassified.extend(pending_claude)
+
+        self._calculate_stats(result, len(transactions))
+
+        return result
+
+    def classify_batch_deferred(
+        self,
+        transactions: list[ParsedTransaction],
+        entity: str | None = None,
+        batch_size: int = 30,
+        poll_interval: float = 30.0
+    ) -> CategorizationResult:
+        """Classify a batch of transactions through one Message Batches API job.
+
+        All Claude batches are submitted together, billed at a discount and
+        run concurrently on the API side, but results can take minutes (up
+        to 24 hours) to arrive, so this suits scheduled imports rather than
+        interactive use. Transactions whose batch fails are left unclassified.
+
+        Args:
+            transactions: Transactions to classify
+            entity: Entity context
+            batch_size: Transactions per Claude prompt
+            poll_interval: Seconds between batch status checks
+
+        Returns:
+            CategorizationResult
+        """
+        # 1. First pass: try merchant lookup
+        result, pending_claude = self._classify_by_lookup(transactions, entity)
+
+        # 2. Second pass: every Claude prompt in a single batch job
+        if pending_claude and self.use_claude and self.client:
+            batches = [
+                pending_claude[i:i + batch_size]
+                for i in range(0, len(pending_claude), batch_size)
+            ]
+            claude_results: dict[int, list[Classification | None]] = {}
+            try:
+                job = self.client.messages.batches.create(requests=[
+                    {
+                        "custom_id": f"classify-{index}",
+                        "params": self._claude_request(batch, entity)
+                    }
+                    for index, batch in enumerate(batches)
+                ])
+                while job.processing_status != "ended":
+                    time.sleep(poll_interval)
+                    job = self.client.messages.batches.retrieve(job.id)
+
+                for entry in self.client.messages.batches.results(job.id):
+                    index = int(entry.custom_id.rsplit("-", 1)[1])
+                    if entry.result.type != "succeeded":
+                        logger.error(
+                            f"Batch classification {entry.custom_id} "
+                            f"{entry.result.type}"
+                        )
+                        continue
+                    try:
+                        claude_results[index] = self._parse_claude_response(
+                            entry.result.message.content[0].text, len(batches[index])
+                        )
+                    except (ValueError, TypeError, KeyError) as e:
+                        # Only this prompt falls back; the rest of the job is kept
+                        logger.error(
+                            f"Batch classification {entry.custom_id} parse error: {e}"
+                        )
+
+            except Exception as e:
+                logger.error(f"Claude batch classification error: {e}")
+
+            for index, batch in enumerate(batches):
+                self._collect_claude_results(
+                    result, batch, claude_results.get(index, [])
+                )
+        else:
+            result.unclassified.extend(pending_claude)
+
+        self._calculate_stats(result, len(transactions))
+
+        return result
+
+    def _classify_by_lookup(
+        self,
+        transactions: list[ParsedTransaction],
+        entity: str | None
+    ) -> tuple[CategorizationResult, list[ParsedTransaction]]:
+        """Classify transactions from the merchant lookup table.
+
+        Args:
+            transactions: Transactions to classify
+            entity: Entity context
+
+        Returns:
+            Tuple of (result holding lookup matches, transactions left for Claude)
+        """
         result = CategorizationResult()
         pending_claude = []
+        # Read once; get_confidence_threshold() re-reads the mappings file
+        threshold = self.merchant_lookup.get_confidence_threshold()
+        # Statements repeat merchants, so each distinct one is looked up once
+        matches: dict[str, MerchantMatch | None] = {}
 
-        # 1. First pass: try merchant lookup
         for txn in transactions:
-            match = self.merchant_lookup.lookup(txn.merchant, entity)
+            try:
+                match = matches[txn.merchant]
+            except KeyError:
+                match = matches[txn.merchant] = self.merchant_lookup.lookup(
+                    txn.merchant, entity
+                )
 
-            if match and match.confidence >= self.merchant_lookup.get_confidence_threshold():
+            if match and match.confidence >= threshold:
                 classification = Classification(
                     account_code=match.account_code,
                     account_name=match.account_name,
@@ -190,34 +397,34 @@ class TransactionCategorizer:
             else:
                 pending_claude.append(txn)
 
-        # 2. Second pass: use Claude for remaining
-        if pending_claude and self.use_claude and self.client:
-            # Process in batches
-            for i in range(0, len(pending_claude), batch_size):
-                batch = pending_claude[i:i + batch_size]
-                classifications = self._classify_with_claude(batch, entity)
+        return result, pending_claude
 
-                for j, txn in enumerate(batch):
-                    if j < len(classifications) and classifications[j]:
-                        result.classified.append(ClassifiedTransaction(
-                            transaction=txn,
-                            classification=classifications[j]
-                        ))
-                    else:
-                        result.unclassified.append(txn)
-        else:
-            result.unclassified.extend(pending_claude)
-
-        # Calculate stats
-        total = len(transactions)
-        lookup_count = sum(
-            1 for ct in result.classified
-            if ct.classification and ct.classification.method == "lookup"
-        )
-        claude_count = sum(
-            1 for ct in result.classified
-            if ct.classification and ct.classification.method == "claude"
-        )
+    def _collect_claude_results(
+        self,
+        result: CategorizationResult,
+        batch: list[ParsedTransaction],
+        classifications: list[Classification | None]
+    ) -> None:
+        """Add one Claude batch's classifications to the result."""
+        for j, txn in enumerate(batch):
+            if j < len(classifications) and classifications[j]:
+                result.classified.append(ClassifiedTransaction(
+                    transaction=txn,
+                    classification=classifications[j]
+                ))
+            else:
+                result.unclassified.append(txn)
+
+    def _calculate_stats(self, result: CategorizationResult, total: int) -> None:
+        """Fill in result.stats."""
+        lookup_count = claude_count = 0
+        for ct in result.classified:
+            if ct.classification:
+                method = ct.classification.method
+                if method == "lookup":
+                    lookup_count += 1
+                elif method == "claude":
+                    claude_count += 1
 
         result.stats = {
             "total": total,
@@ -228,8 +435,6 @@ class TransactionCategorizer:
             "classification_rate": len(result.classified) / total if total > 0 else 0
         }
 
-        return result
-
     def _classify_with_claude(
         self,
         transactions: list[ParsedTransaction],
@@ -247,6 +452,111 @@ class TransactionCategorizer:
         if not transactions:
             return []
 
+        try:
+            message = self._create_message(self._claude_request(transactions, entity))
+            return self._parse_claude_response(
+                message.content[0].text, len(transactions)
+            )
+
+        except Exception as e:
+            logger.error(f"Claude classification error: {e}")
+            return [None] * len(transactions)
+
+    async def _classify_with_claude_async(
+        self,
+        transactions: list[ParsedTransaction],
+        entity: str | None
+    ) -> list[Classification | None]:
+        """Classify transactions using the async Claude client.
+
+        Args:
+            transactions: Transactions to classify
+            entity: Entity context
+
+        Returns:
+            List of Classifications (may contain None for failures)
+        """
+        if not transactions:
+            return []
+
+        try:
+            message = await self._create_message_async(
+                self._claude_request(transactions, entity)
+            )
+            return self._parse_claude_response(
+                message.content[0].text, len(transactions)
+            )
+
+        except Exception as e:
+            logger.error(f"Claude classification error: {e}")
+            return [None] * len(transactions)
+
+    def _create_message(self, request: dict[str, Any]) -> Any:
+        """Send a classification request, retrying when rate limited.
+
+        Args:
+            request: messages.create parameters from _claude_request
+
+        Returns:
+            Claude message
+
+        Raises:
+            anthropic.RateLimitError: If still rate limited after
+                RATE_LIMIT_RETRIES retries
+        """
+        tokens = estimate_tokens(request["messages"][0]["content"])
+        for attempt in range(self.RATE_LIMIT_RETRIES + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire(tokens)
+            try:
+                return self.client.messages.create(**request)
+            except anthropic.RateLimitError as e:
+                if attempt == self.RATE_LIMIT_RETRIES:
+                    raise
+                wait = retry_after_seconds(e, attempt)
+                logger.warning(f"Claude rate limited, retrying in {wait:.1f}s")
+                time.sleep(wait)
+
+    async def _create_message_async(self, request: dict[str, Any]) -> Any:
+        """Async counterpart of _create_message.
+
+        Args:
+            request: messages.create parameters from _claude_request
+
+        Returns:
+            Claude message
+
+        Raises:
+            anthropic.RateLimitError: If still rate limited after
+                RATE_LIMIT_RETRIES retries
+        """
+        tokens = estimate_tokens(request["messages"][0]["content"])
+        for attempt in range(self.RATE_LIMIT_RETRIES + 1):
+            if self.rate_limiter:
+                await self.rate_limiter.acquire_async(tokens)
+            try:
+                return await self.async_client.messages.create(**request)
+            except anthropic.RateLimitError as e:
+                if attempt == self.RATE_LIMIT_RETRIES:
+                    raise
+                wait = retry_after_seconds(e, attempt)
+                logger.warning(f"Claude rate limited, retrying in {wait:.1f}s")
+                await asyncio.sleep(wait)
+
+    def _claude_request(
+        self,
+        transactions: list[ParsedTransaction],
+        entity: str | None
+    ) -> dict[str, Any]:
+        """Build messages.create parameters for a classification batch.
+
+        Args:
+            transactions: Transactions to classify
+            entity: Entity context
+
+        Returns:
+            Keyword arguments for messages.create
+        """
         # Build prompt
         txn_data = [
             {
@@ -260,13 +570,11 @@ class TransactionCategorizer:
         ]
 
         # Build system prompt with chart of accounts
-        coa_str = yaml.dump(self.chart_of_accounts, default_flow_style=False)
-
         system_prompt = f"""You are an accounting classification engine for BK Keyforce / BETRNK Group.
 Entity: {entity or 'Unknown'}
 
 Chart of accounts:
-{coa_str}
+{self._coa_str}
 
 Categories: revenue, commission, salary, expense, company_car, depreciation, cos, bank_charge
 
@@ -275,54 +583,62 @@ For each transaction: account_code, account_name, category, confidence (0.0-1.0)
 
         user_prompt = f"""Classify these {len(transactions)} transactions:
 
-{json.dumps(txn_data, indent=2)}
+{_dumps_indented(txn_data)}
 
 Return JSON array with same order as input."""
 
-        try:
-            message = self.client.messages.create(
-                model=self.model,
-                max_tokens=4096,
-                messages=[
-                    {"role": "user", "content": f"{system_prompt}\n\n{user_prompt}"}
-                ]
-            )
+        return {
+            "model": self.model,
+            "max_tokens": 4096,
+            "messages": [
+                {"role": "user", "content": f"{system_prompt}\n\n{user_prompt}"}
+            ],
+        }
+
+    def _parse_claude_response(
+        self,
+        response_text: str,
+        count: int
+    ) -> list[Classification | None]:
+        """Parse Claude's JSON classification array.
 
-            response_text = message.content[0].text
-
-            # Parse response
-            cleaned = response_text.strip()
-            cleaned = re.sub(r'^```json\s*', '', cleaned)
-            cleaned = re.sub(r'^```\s*', '', cleaned)
-            cleaned = re.sub(r'\s*```$', '', cleaned)
-
-            classifications_data = json.loads(cleaned)
-
-            # Convert to Classification objects
-            results = []
-            for i, data in enumerate(classifications_data):
-                if isinstance(data, dict) and "account_code" in data:
-                    results.append(Classification(
-                        account_code=data.get("account_code", ""),
-                        account_name=data.get("account_name", ""),
-                        category=data.get("category", "expense"),
-                        confidence=float(data.get("confidence", 0.5)),
-                        method="claude",
-                        anomaly=data.get("anomaly", False),
-                        anomaly_reason=data.get("anomaly_reason")
-                    ))
-                else:
-                    results.append(None)
-
-            # Pad with None if response is shorter than input
-            while len(results) < len(transactions):
+        Args:
+            response_text: Raw response text
+            count: Number of transactions in the batch
+
+        Returns:
+            List of Classifications, padded with None to count
+        """
+        # Parse response, tolerating markdown code fences
+        cleaned = response_text.strip()
+        if cleaned.startswith("```"):
+            cleaned = cleaned.removeprefix("```json").removeprefix("```").lstrip()
+        if cleaned.endswith("```"):
+            cleaned = cleaned[:-3].rstrip()
+
+        classifications_data = _loads(cleaned)
+
+        # Convert to Classification objects
+        results = []
+        for i, data in enumerate(classifications_data):
+            if isinstance(data, dict) and "account_code" in data:
+                results.append(Classification(
+                    account_code=data.get("account_code", ""),
+                    account_name=data.get("account_name", ""),
+                    category=data.get("category", "expense"),
+                    confidence=float(data.get("confidence", 0.5)),
+                    method="claude",
+                    anomaly=data.get("anomaly", False),
+                    anomaly_reason=data.get("anomaly_reason")
+                ))
+            else:
                 results.append(None)
 
-            return results
+        # Pad with None if response is shorter than input
+        while len(results) < count:
+            results.append(None)
 
-        except Exception as e:
-            logger.error(f"Claude classification error: {e}")
-            return [None] * len(transactions)
+        return results
 
     def detect_anomalies(
         self,
@@ -414,7 +730,5 @@ Return JSON array with same order as input."""
                         "reason": "Common expense category"
                     })
 
-        # Sort by confidence
-        suggestions.sort(key=lambda x: x["confidence"], reverse=True)
-
-        return suggestions[:5]
+        # Top 5 by confidence
+        return heapq.nlargest(5, suggestions, key=lambda x: x["confidence"])
@@ -11,12 +11,55 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from datetime import datetime
 from decimal import Decimal
-from io import StringIO
 from pathlib import Path
 from typing import Any, Iterator
 
-
-@dataclass
+# Amount cleaning: currency symbols and whitespace
+_CURRENCY_RE = re.compile(r'[₱PHPP\s]')
+
+# Merchant extraction: common description prefixes, applied in order
+_MERCHANT_PREFIX_RES = tuple(
+    re.compile(prefix, re.IGNORECASE)
+    for prefix in (
+        r'^POS PURCHASE\s*-?\s*',
+        r'^POS\s*-?\s*',
+        r'^ONLINE\s*-?\s*',
+        r'^BILLS PAYMENT\s*-?\s*',
+        r'^PAYMENT\s*-?\s*',
+        r'^TRANSFER\s*-?\s*',
+    )
+)
+# Merchant extraction: trailing reference numbers and dates
+_TRAILING_REFERENCE_RE = re.compile(r'\s*-?\s*\d{6,}$')
+_TRAILING_DATE_RE = re.compile(r'\s*\d{2}/\d{2}/\d{2,4}$')
+
+
+def iter_lines(content: str) -> Iterator[str]:
+    """Yield the lines of content, newline included, without copying it.
+
+    Unlike StringIO (which holds a 4-byte-per-character copy of the text)
+    or str.split (which materialises every line up front), only the
+    current line is allocated.
+
+    Args:
+        content: Text with LF line endings
+
+    Yields:
+        Each line including its line ending (the last may have none)
+    """
+    find = content.find
+    start = 0
+    while True:
+        end = find('\n', start) + 1
+        if not end:
+            if start < len(content):
+                yield content[start:]
+            return
+        yield content[start:end]
+        start = end
+
+
+@dataclass(slots=True)
 class ParsedTransaction:
     """Represents a parsed transaction from a bank statement."""
 
@@ -29,6 +72,7 @@ class ParsedTransaction:
     balance: Decimal | None = None
     transaction_type: str | None = None  # 'debit' or 'credit'
     raw_data: dict = field(default_factory=dict)
+    _hash: str | None = field(default=None, init=False, repr=False, compare=False)
 
     @property
     def is_expense(self) -> bool:
@@ -37,12 +81,19 @@ class ParsedTransaction:
 
     @property
     def hash(self) -> str:
-        """Generate a hash for duplicate detection."""
-        data = f"{self.date.isoformat()}|{self.description}|{self.amount}"
-        return hashlib.sha256(data.encode()).hexdigest()[:16]
+        """Generate a hash for duplicate detection.
+
+        Only compared within a process, so a fast 8-byte BLAKE2b digest is
+        used rather than a truncated SHA-256. Computed on first access;
+        parsed transactions are not modified afterwards.
+        """
+        if self._hash is None:
+            data = f"{self.date.isoformat()}|{self.description}|{self.amount}"
+            self._hash = hashlib.blake2b(data.encode(), digest_size=8).hexdigest()
+        return self._hash
 
 
-@dataclass
+@dataclass(slots=True)
 class ParseResult:
     """Result of parsing a bank statement."""
 
@@ -85,6 +136,13 @@ class BaseCSVParser(ABC):
         "%m/%d",
     ]
 
+    # True if no date string can match more than one of DATE_FORMATS, so the
+    # format that matched last may be tried first without changing results
+    DATE_FORMATS_EXCLUSIVE = False
+
+    # Column type -> accepted header names, in order of preference
+    COLUMN_MAPPINGS: dict[str, list[str]] = {}
+
     def __init__(self, encoding: str = "utf-8", delimiter: str = ","):
         """Initialize the parser.
 
@@ -94,6 +152,17 @@ class BaseCSVParser(ABC):
         """
         self.encoding = encoding
         self.delimiter = delimiter
+        # (date_str, year_hint) -> parsed date, reset for each statement
+        self._date_cache: dict[tuple[str, int | None], datetime] = {}
+        self._last_date_format: str | None = None
+        # column_type -> header present in the current file, resolved on first row
+        self._columns: dict[str, str | None] | None = None
+
+    def _reset_statement_state(self) -> None:
+        """Clear per-statement caches before parsing new content."""
+        self._date_cache = {}
+        self._last_date_format = None
+        self._columns = None
 
     def parse_file(self, file_path: Path | str) -> ParseResult:
         """Parse a CSV file.
@@ -121,6 +190,7 @@ class BaseCSVParser(ABC):
             ParseResult object
         """
         result = ParseResult(bank=self.BANK_CODE)
+        self._reset_statement_state()
 
         try:
             # Preprocess content
@@ -128,7 +198,7 @@ class BaseCSVParser(ABC):
 
             # Parse CSV
             reader = csv.DictReader(
-                StringIO(content),
+                iter_lines(content),
                 delimiter=self.delimiter
             )
 
@@ -171,6 +241,24 @@ class BaseCSVParser(ABC):
 
         return content
 
+    def _resolve_columns(self, row: dict) -> dict[str, str | None]:
+        """Map each column type to the first matching header in this file."""
+        return {
+            column_type: next((name for name in possible_names if name in row), None)
+            for column_type, possible_names in self.COLUMN_MAPPINGS.items()
+        }
+
+    def _get_column_value(self, row: dict, column_type: str) -> str | None:
+        """Get value from row using column mappings.
+
+        Every row of a file has the same headers, so COLUMN_MAPPINGS is
+        resolved against the first row only.
+        """
+        if self._columns is None:
+            self._columns = self._resolve_columns(row)
+        name = self._columns.get(column_type)
+        return row[name] if name is not None else None
+
     @abstractmethod
     def _parse_row(self, row: dict[str, str]) -> ParsedTransaction | None:
         """Parse a single CSV row into a transaction.
@@ -203,17 +291,28 @@ class BaseCSVParser(ABC):
         # Sort by date
         result.transactions.sort(key=lambda t: t.date)
 
-        # Calculate summary
+        # Calculate summary in one pass (the total_* properties each rescan)
+        total_debits = total_credits = Decimal("0")
+        for transaction in result.transactions:
+            amount = transaction.amount
+            if amount > 0:
+                total_debits += amount
+            elif amount < 0:
+                total_credits -= amount
+
         result.summary = {
             "total_transactions": result.transaction_count,
-            "total_debits": float(result.total_debits),
-            "total_credits": float(result.total_credits),
-            "net_amount": float(result.total_debits - result.total_credits)
+            "total_debits": float(total_debits),
+            "total_credits": float(total_credits),
+            "net_amount": float(total_debits - total_credits)
         }
 
     def _parse_date(self, date_str: str, year_hint: int | None = None) -> datetime:
         """Parse a date string using multiple format patterns.
 
+        A statement repeats the same few hundred dates across all its rows,
+        so each distinct string is only run through strptime once.
+
         Args:
             date_str: Date string to parse
             year_hint: Year to use if not present in date string
@@ -224,25 +323,54 @@ class BaseCSVParser(ABC):
         Raises:
             ValueError: If date cannot be parsed
         """
-        date_str = date_str.strip()
+        key = (date_str, year_hint)
+        dt = self._date_cache.get(key)
+        if dt is None:
+            dt = self._date_cache[key] = self._parse_date_formats(
+                date_str.strip(), year_hint
+            )
+        return dt
+
+    def _parse_date_formats(self, date_str: str, year_hint: int | None) -> datetime:
+        """Try each of DATE_FORMATS in turn (uncached _parse_date).
+
+        A statement uses one date format throughout, so with
+        DATE_FORMATS_EXCLUSIVE the last format that matched is tried first
+        and the failed strptime calls before it are skipped.
+        """
+        last_format = self._last_date_format
+        if last_format is not None:
+            try:
+                return self._strptime(date_str, last_format, year_hint)
+            except ValueError:
+                pass
 
         for fmt in self.DATE_FORMATS:
+            if fmt == last_format:
+                continue
             try:
-                dt = datetime.strptime(date_str, fmt)
-
-                # Handle year-less formats
-                if "%Y" not in fmt and "%y" not in fmt:
-                    if year_hint:
-                        dt = dt.replace(year=year_hint)
-                    else:
-                        dt = dt.replace(year=datetime.now().year)
-
-                return dt
+                dt = self._strptime(date_str, fmt, year_hint)
             except ValueError:
                 continue
+            if self.DATE_FORMATS_EXCLUSIVE:
+                self._last_date_format = fmt
+            return dt
 
         raise ValueError(f"Cannot parse date: {date_str}")
 
+    def _strptime(self, date_str: str, fmt: str, year_hint: int | None) -> datetime:
+        """Parse date_str with one format, filling in the year if it has none."""
+        dt = datetime.strptime(date_str, fmt)
+
+        # Handle year-less formats
+        if "%Y" not in fmt and "%y" not in fmt:
+            if year_hint:
+                dt = dt.replace(year=year_hint)
+            else:
+                dt = dt.replace(year=datetime.now().year)
+
+        return dt
+
     def _parse_amount(self, amount_str: str) -> Decimal:
         """Parse an amount string to Decimal.
 
@@ -255,8 +383,13 @@ class BaseCSVParser(ABC):
         if not amount_str or amount_str.strip() == "":
             return Decimal("0")
 
+        # Fast path for the common unsigned "1,234.56" form
+        digits = amount_str.replace(',', '')
+        if digits.replace('.', '', 1).isdecimal():
+            return Decimal(digits)
+
         # Remove currency symbols and whitespace
-        cleaned = re.sub(r'[₱PHPP\s]', '', amount_str)
+        cleaned = _CURRENCY_RE.sub('', amount_str)
 
         # Handle negative indicators
         is_negative = False
@@ -289,22 +422,13 @@ class BaseCSVParser(ABC):
             Extracted merchant name
         """
         # Remove common prefixes
-        prefixes = [
-            r'^POS PURCHASE\s*-?\s*',
-            r'^POS\s*-?\s*',
-            r'^ONLINE\s*-?\s*',
-            r'^BILLS PAYMENT\s*-?\s*',
-            r'^PAYMENT\s*-?\s*',
-            r'^TRANSFER\s*-?\s*',
-        ]
-
         merchant = description.upper()
-        for prefix in prefixes:
-            merchant = re.sub(prefix, '', merchant, flags=re.IGNORECASE)
+        for prefix in _MERCHANT_PREFIX_RES:
+            merchant = prefix.sub('', merchant)
 
         # Remove trailing reference numbers
-        merchant = re.sub(r'\s*-?\s*\d{6,}$', '', merchant)
-        merchant = re.sub(r'\s*\d{2}/\d{2}/\d{2,4}$', '', merchant)
+        merchant = _TRAILING_REFERENCE_RE.sub('', merchant)
+        merchant = _TRAILING_DATE_RE.sub('', merchant)
 
         # Clean up
         merchant = merchant.strip(' -')
@@ -8,7 +8,28 @@ import re
 from datetime import datetime
 from decimal import Decimal
 
-from .base import BaseCSVParser, ParsedTransaction, ParseResult
+from .base import BaseCSVParser, ParsedTransaction, ParseResult, iter_lines
+
+_STATEMENT_YEAR_RE = re.compile(r'Statement.*?(\d{4})')
+_CARD_NUMBER_RE = re.compile(r'Card.*?(\d{4})\s*$', re.MULTILINE)
+_ACCOUNT_NUMBER_RE = re.compile(r'Account.*?(\d{4})\s*$', re.MULTILINE)
+_STATEMENT_PERIOD_RE = re.compile(
+    r'Statement\s+(?:Period|Date)[:\s]+.*?(\d{1,2}[-/]\w{3}[-/]\d{2,4})'
+    r'.*?(?:to|-)\s*(\d{1,2}[-/]\w{3}[-/]\d{2,4})',
+    re.IGNORECASE
+)
+_TRAILING_DATE_RE = re.compile(r'\s+\d{2}/\d{2}$')
+_POS_PREFIX_RE = re.compile(r'^POS\s*[-]?\s*', re.IGNORECASE)
+
+# Month abbreviations for the DD-Mon-YYYY fast path (strptime %b is case-insensitive)
+_MONTHS = {
+    name: number
+    for number, name in enumerate(
+        ("jan", "feb", "mar", "apr", "may", "jun",
+         "jul", "aug", "sep", "oct", "nov", "dec"),
+        start=1
+    )
+}
 
 
 class BDOParser(BaseCSVParser):
@@ -24,6 +45,7 @@ class BDOParser(BaseCSVParser):
         "%m/%d/%Y",   # 01/15/2025
         "%m/%d",      # 01/15 (year from context)
     ]
+    DATE_FORMATS_EXCLUSIVE = True
 
     # Column mappings for different BDO export formats
     COLUMN_MAPPINGS = {
@@ -45,29 +67,20 @@ class BDOParser(BaseCSVParser):
         content = super()._preprocess_content(content)
 
         # Extract statement year from header if present
-        year_match = re.search(r'Statement.*?(\d{4})', content)
+        year_match = _STATEMENT_YEAR_RE.search(content)
         if year_match:
             self._statement_year = int(year_match.group(1))
         else:
             self._statement_year = datetime.now().year
 
         # Find and skip to data rows
-        lines = content.split('\n')
-        data_start = 0
-
-        for i, line in enumerate(lines):
+        offset = 0
+        for line in iter_lines(content):
             if any(col in line for col in ["Posting Date", "POST DATE", "Date", "Transaction Date"]):
-                data_start = i
-                break
-
-        return '\n'.join(lines[data_start:])
+                return content[offset:]
+            offset += len(line)
 
-    def _get_column_value(self, row: dict, column_type: str) -> str | None:
-        """Get value from row using column mappings."""
-        for possible_name in self.COLUMN_MAPPINGS.get(column_type, []):
-            if possible_name in row:
-                return row[possible_name]
-        return None
+        return content
 
     def _parse_row(self, row: dict[str, str]) -> ParsedTransaction | None:
         """Parse a BDO CSV row."""
@@ -139,24 +152,42 @@ class BDOParser(BaseCSVParser):
             amount=amount,
             reference=reference,
             transaction_type=txn_type,
-            raw_data=dict(row)
+            raw_data=row
         )
 
+    def _parse_date_formats(self, date_str: str, year_hint: int | None) -> datetime:
+        """Parse BDO's usual DD-Mon-YYYY dates without strptime.
+
+        strptime runs a pure-Python regex state machine per call; splitting on
+        the dashes and looking the month up directly gives the same result as
+        the "%d-%b-%Y" format. Anything else falls back to DATE_FORMATS.
+        """
+        day, _, rest = date_str.partition("-")
+        month, _, year = rest.partition("-")
+        month_number = _MONTHS.get(month.lower())
+        if (
+            month_number
+            and date_str.isascii()
+            and len(day) <= 2 and day.isdigit()
+            and len(year) == 4 and year.isdigit()
+        ):
+            try:
+                return datetime(int(year), month_number, int(day))
+            except ValueError:
+                pass
+        return super()._parse_date_formats(date_str, year_hint)
+
     def _extract_metadata(self, content: str, result: ParseResult) -> None:
         """Extract BDO-specific metadata."""
         # Account number (last 4 digits)
-        account_match = re.search(r'Card.*?(\d{4})\s*$', content, re.MULTILINE)
+        account_match = _CARD_NUMBER_RE.search(content)
         if not account_match:
-            account_match = re.search(r'Account.*?(\d{4})\s*$', content, re.MULTILINE)
+            account_match = _ACCOUNT_NUMBER_RE.search(content)
         if account_match:
             result.account_last_four = account_match.group(1)
 
         # Statement period
-        period_match = re.search(
-            r'Statement\s+(?:Period|Date)[:\s]+.*?(\d{1,2}[-/]\w{3}[-/]\d{2,4}).*?(?:to|-)\s*(\d{1,2}[-/]\w{3}[-/]\d{2,4})',
-            content,
-            re.IGNORECASE
-        )
+        period_match = _STATEMENT_PERIOD_RE.search(content)
         if period_match:
             try:
                 result.statement_period_start = self._parse_date(period_match.group(1))
@@ -168,10 +199,10 @@ class BDOParser(BaseCSVParser):
         """Extract merchant from BDO description format."""
         # BDO credit card format: "MERCHANT NAME    01/15"
         # Remove trailing date
-        cleaned = re.sub(r'\s+\d{2}/\d{2}$', '', description)
+        cleaned = _TRAILING_DATE_RE.sub('', description)
 
         # Remove POS prefix if present
-        cleaned = re.sub(r'^POS\s*[-]?\s*', '', cleaned, flags=re.IGNORECASE)
+        cleaned = _POS_PREFIX_RE.sub('', cleaned)
 
         # Clean up extra spaces
         cleaned = ' '.join(cleaned.split())
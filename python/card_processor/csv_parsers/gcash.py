@@ -10,6 +10,19 @@ from decimal import Decimal
 
 from .base import BaseCSVParser, ParsedTransaction, ParseResult
 
+_PHONE_NUMBER_RE = re.compile(
+    r'(?:Mobile|Phone|Number)[:\s]+.*?(\d{4})\s*$', re.MULTILINE
+)
+_EXPORT_PERIOD_RE = re.compile(
+    r'(?:Period|From)[:\s]+(\w+\s+\d{1,2},\s+\d{4})'
+    r'.*?(?:to|-)\s*(\w+\s+\d{1,2},\s+\d{4})',
+    re.IGNORECASE
+)
+_PAYMENT_TO_RE = re.compile(r'^Payment\s+to\s+(.+)$', re.IGNORECASE)
+_SEND_MONEY_TO_RE = re.compile(r'^Send\s+Money\s+to\s+(.+)$', re.IGNORECASE)
+_BILLS_PAYMENT_RE = re.compile(r'^Bills\s+Payment\s*[-:]\s*(.+)$', re.IGNORECASE)
+_CASH_OUT_RE = re.compile(r'^Cash\s+Out\s*[-:@]\s*(.+)$', re.IGNORECASE)
+
 
 class GCashParser(BaseCSVParser):
     """Parser for GCash CSV exports."""
@@ -25,6 +38,7 @@ class GCashParser(BaseCSVParser):
         "%Y-%m-%d %H:%M:%S",
         "%Y-%m-%d",
     ]
+    DATE_FORMATS_EXCLUSIVE = True
 
     # Transaction types that are expenses (money out)
     EXPENSE_TYPES = [
@@ -61,13 +75,6 @@ class GCashParser(BaseCSVParser):
     def __init__(self):
         super().__init__(encoding="utf-8", delimiter=",")
 
-    def _get_column_value(self, row: dict, column_type: str) -> str | None:
-        """Get value from row using column mappings."""
-        for possible_name in self.COLUMN_MAPPINGS.get(column_type, []):
-            if possible_name in row:
-                return row[possible_name]
-        return None
-
     def _parse_row(self, row: dict[str, str]) -> ParsedTransaction | None:
         """Parse a GCash CSV row."""
         # Get date
@@ -145,22 +152,18 @@ class GCashParser(BaseCSVParser):
             amount=amount,
             reference=reference,
             transaction_type="debit" if amount > 0 else "credit",
-            raw_data=dict(row)
+            raw_data=row
         )
 
     def _extract_metadata(self, content: str, result: ParseResult) -> None:
         """Extract GCash-specific metadata."""
         # GCash mobile number (last 4)
-        phone_match = re.search(r'(?:Mobile|Phone|Number)[:\s]+.*?(\d{4})\s*$', content, re.MULTILINE)
+        phone_match = _PHONE_NUMBER_RE.search(content)
         if phone_match:
             result.account_last_four = phone_match.group(1)
 
         # Export date range
-        date_match = re.search(
-            r'(?:Period|From)[:\s]+(\w+\s+\d{1,2},\s+\d{4}).*?(?:to|-)\s*(\w+\s+\d{1,2},\s+\d{4})',
-            content,
-            re.IGNORECASE
-        )
+        date_match = _EXPORT_PERIOD_RE.search(content)
         if date_match:
             try:
                 result.statement_period_start = self._parse_date(date_match.group(1))
@@ -176,22 +179,22 @@ class GCashParser(BaseCSVParser):
         # "Bills Payment - MERALCO"
 
         # Payment to pattern
-        match = re.match(r'^Payment\s+to\s+(.+)$', description, re.IGNORECASE)
+        match = _PAYMENT_TO_RE.match(description)
         if match:
             return match.group(1).strip().upper()
 
         # Send Money to pattern
-        match = re.match(r'^Send\s+Money\s+to\s+(.+)$', description, re.IGNORECASE)
+        match = _SEND_MONEY_TO_RE.match(description)
         if match:
             return match.group(1).strip().upper()
 
         # Bills Payment pattern
-        match = re.match(r'^Bills\s+Payment\s*[-:]\s*(.+)$', description, re.IGNORECASE)
+        match = _BILLS_PAYMENT_RE.match(description)
         if match:
             return match.group(1).strip().upper()
 
         # Cash Out pattern
-        match = re.match(r'^Cash\s+Out\s*[-:@]\s*(.+)$', description, re.IGNORECASE)
+        match = _CASH_OUT_RE.match(description)
         if match:
             return match.group(1).strip().upper()
 
@@ -9,10 +9,9 @@ import csv
 import re
 from datetime import datetime
 from decimal import Decimal
-from io import StringIO
 from typing import Any
 
-from .base import BaseCSVParser, ParsedTransaction, ParseResult
+from .base import BaseCSVParser, ParsedTransaction, ParseResult, iter_lines
 
 
 class GenericParser(BaseCSVParser):
@@ -50,6 +49,9 @@ class GenericParser(BaseCSVParser):
         super().__init__(encoding="utf-8", delimiter=",")
         self._column_mapping: dict[str, str] = {}
         self._detected_format: str = "unknown"
+        self._headers: list[str] = []
+        # field type -> position of its column in each row
+        self._column_index: dict[str, int] = {}
 
     def _preprocess_content(self, content: str) -> str:
         """Preprocess and detect format."""
@@ -138,12 +140,13 @@ class GenericParser(BaseCSVParser):
     def parse_content(self, content: str) -> ParseResult:
         """Parse CSV content with auto-detection."""
         result = ParseResult(bank=self.BANK_CODE)
+        self._reset_statement_state()
 
         try:
             content = self._preprocess_content(content)
 
-            # Read headers first
-            reader = csv.reader(StringIO(content))
+            # Read headers, then continue with the same reader for the rows
+            reader = csv.reader(iter_lines(content))
             headers = next(reader, [])
 
             if not headers:
@@ -160,12 +163,19 @@ class GenericParser(BaseCSVParser):
             if "description" not in self._column_mapping:
                 result.warnings.append("Could not detect description column")
 
-            # Re-parse with DictReader
-            dict_reader = csv.DictReader(StringIO(content))
-
-            for row_num, row in enumerate(dict_reader, start=2):
+            # Resolve columns to positions; a repeated header reads its last
+            # column, as DictReader did
+            self._headers = headers
+            positions = {header: index for index, header in enumerate(headers)}
+            self._column_index = {
+                field_type: positions[header]
+                for field_type, header in self._column_mapping.items()
+            }
+
+            # Skip blank lines, as DictReader did
+            for row_num, row in enumerate(filter(None, reader), start=2):
                 try:
-                    transaction = self._parse_row(row)
+                    transaction = self._parse_fields(row)
                     if transaction:
                         result.transactions.append(transaction)
                 except ValueError as e:
@@ -187,13 +197,20 @@ class GenericParser(BaseCSVParser):
         return result
 
     def _parse_row(self, row: dict[str, str]) -> ParsedTransaction | None:
-        """Parse a row using auto-detected column mapping."""
-        # Get date
-        date_col = self._column_mapping.get("date")
-        if not date_col or date_col not in row:
+        """Parse a DictReader-style row using auto-detected column mapping."""
+        return self._parse_fields([row.get(header) for header in self._headers])
+
+    def _field(self, fields: list[str], field_type: str) -> str | None:
+        """Get a detected column's value, or None if absent from this row."""
+        index = self._column_index.get(field_type)
+        if index is None or index >= len(fields):
             return None
+        return fields[index]
 
-        date_str = row[date_col]
+    def _parse_fields(self, fields: list[str]) -> ParsedTransaction | None:
+        """Parse a csv.reader row using the auto-detected column positions."""
+        # Get date
+        date_str = self._field(fields, "date")
         if not date_str or date_str.strip() == "":
             return None
 
@@ -204,18 +221,15 @@ class GenericParser(BaseCSVParser):
 
         # Get posting date
         posting_date = None
-        posting_col = self._column_mapping.get("posting_date")
-        if posting_col and posting_col in row:
+        posting_str = self._field(fields, "posting_date")
+        if posting_str is not None:
             try:
-                posting_date = self._parse_date(row[posting_col])
+                posting_date = self._parse_date(posting_str)
             except ValueError:
                 pass
 
         # Get description
-        description = ""
-        desc_col = self._column_mapping.get("description")
-        if desc_col and desc_col in row:
-            description = row[desc_col].strip()
+        description = (self._field(fields, "description") or "").strip()
 
         # Skip empty descriptions
         if not description:
@@ -223,29 +237,29 @@ class GenericParser(BaseCSVParser):
 
         # Get reference
         reference = None
-        ref_col = self._column_mapping.get("reference")
-        if ref_col and ref_col in row:
-            reference = row[ref_col].strip() or None
+        reference_str = self._field(fields, "reference")
+        if reference_str is not None:
+            reference = reference_str.strip() or None
 
         # Parse amount
         amount = Decimal("0")
         txn_type = "debit"
 
         # Try single amount column first
-        amount_col = self._column_mapping.get("amount")
-        if amount_col and amount_col in row and row[amount_col].strip():
-            amount = self._parse_amount(row[amount_col])
+        amount_str = self._field(fields, "amount")
+        if amount_str and amount_str.strip():
+            amount = self._parse_amount(amount_str)
             txn_type = "credit" if amount < 0 else "debit"
         else:
             # Try separate debit/credit columns
-            debit_col = self._column_mapping.get("debit")
-            credit_col = self._column_mapping.get("credit")
+            debit_str = self._field(fields, "debit")
+            credit_str = self._field(fields, "credit")
 
-            if debit_col and debit_col in row and row[debit_col].strip():
-                amount = self._parse_amount(row[debit_col])
+            if debit_str and debit_str.strip():
+                amount = self._parse_amount(debit_str)
                 txn_type = "debit"
-            elif credit_col and credit_col in row and row[credit_col].strip():
-                amount = -self._parse_amount(row[credit_col])
+            elif credit_str and credit_str.strip():
+                amount = -self._parse_amount(credit_str)
                 txn_type = "credit"
 
         if amount == 0:
@@ -253,10 +267,10 @@ class GenericParser(BaseCSVParser):
 
         # Get balance
         balance = None
-        bal_col = self._column_mapping.get("balance")
-        if bal_col and bal_col in row and row[bal_col].strip():
+        balance_str = self._field(fields, "balance")
+        if balance_str and balance_str.strip():
             try:
-                balance = self._parse_amount(row[bal_col])
+                balance = self._parse_amount(balance_str)
             except ValueError:
                 pass
 
@@ -272,9 +286,20 @@ class GenericParser(BaseCSVParser):
             reference=reference,
             balance=balance,
             transaction_type=txn_type,
-            raw_data=dict(row)
+            raw_data=self._raw_data(fields)
         )
 
+    def _raw_data(self, fields: list[str]) -> dict:
+        """Build the header -> value dict csv.DictReader would have produced."""
+        headers = self._headers
+        raw_data = dict(zip(headers, fields))
+        if len(fields) > len(headers):
+            raw_data[None] = fields[len(headers):]
+        elif len(fields) < len(headers):
+            for header in headers[len(fields):]:
+                raw_data[header] = None
+        return raw_data
+
 
 def detect_and_parse(content: str) -> ParseResult:
     """Convenience function to detect bank and parse content.
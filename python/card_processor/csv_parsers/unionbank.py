@@ -10,6 +10,18 @@ from decimal import Decimal
 
 from .base import BaseCSVParser, ParsedTransaction, ParseResult
 
+_ACCOUNT_NUMBER_RE = re.compile(r'Account.*?(\d{4})\s*$', re.MULTILINE)
+_STATEMENT_PERIOD_RE = re.compile(
+    r'Statement Period[:\s]+(\d{1,2}/\d{1,2}/\d{4})'
+    r'\s*(?:to|-)\s*(\d{1,2}/\d{1,2}/\d{4})',
+    re.IGNORECASE
+)
+_PREFIXED_MERCHANT_RE = re.compile(
+    r'^(?:POS PURCHASE|ONLINE TRANSFER|BILLS PAYMENT)\s*-\s*(.+?)\s*-\s*\d+',
+    re.IGNORECASE
+)
+_INSTAPAY_RE = re.compile(r'^INSTAPAY\s+TO\s+(.+?)\s+\d+', re.IGNORECASE)
+
 
 class UnionBankParser(BaseCSVParser):
     """Parser for UnionBank CSV exports."""
@@ -47,13 +59,6 @@ class UnionBankParser(BaseCSVParser):
 
         return '\n'.join(lines[data_start:])
 
-    def _get_column_value(self, row: dict, column_type: str) -> str | None:
-        """Get value from row using column mappings."""
-        for possible_name in self.COLUMN_MAPPINGS.get(column_type, []):
-            if possible_name in row:
-                return row[possible_name]
-        return None
-
     def _parse_row(self, row: dict[str, str]) -> ParsedTransaction | None:
         """Parse a UnionBank CSV row."""
         # Get date
@@ -124,22 +129,18 @@ class UnionBankParser(BaseCSVParser):
             reference=reference,
             balance=balance,
             transaction_type=txn_type,
-            raw_data=dict(row)
+            raw_data=row
         )
 
     def _extract_metadata(self, content: str, result: ParseResult) -> None:
         """Extract UnionBank-specific metadata."""
         # Try to find account number
-        account_match = re.search(r'Account.*?(\d{4})\s*$', content, re.MULTILINE)
+        account_match = _ACCOUNT_NUMBER_RE.search(content)
         if account_match:
             result.account_last_four = account_match.group(1)
 
         # Try to find statement period
-        period_match = re.search(
-            r'Statement Period[:\s]+(\d{1,2}/\d{1,2}/\d{4})\s*(?:to|-)\s*(\d{1,2}/\d{1,2}/\d{4})',
-            content,
-            re.IGNORECASE
-        )
+        period_match = _STATEMENT_PERIOD_RE.search(content)
         if period_match:
             try:
                 result.statement_period_start = self._parse_date(period_match.group(1))
@@ -150,12 +151,12 @@ class UnionBankParser(BaseCSVParser):
     def _extract_merchant(self, description: str) -> str:
         """Extract merchant from UnionBank description format."""
         # UnionBank format: "POS PURCHASE - MERCHANT NAME - 123456"
-        match = re.match(r'^(?:POS PURCHASE|ONLINE TRANSFER|BILLS PAYMENT)\s*-\s*(.+?)\s*-\s*\d+', description, re.IGNORECASE)
+        match = _PREFIXED_MERCHANT_RE.match(description)
         if match:
             return match.group(1).strip().upper()
 
         # InstaPay format: "INSTAPAY TO MERCHANT 123456"
-        match = re.match(r'^INSTAPAY\s+TO\s+(.+?)\s+\d+', description, re.IGNORECASE)
+        match = _INSTAPAY_RE.match(description)
         if match:
             return match.group(1).strip().upper()
 
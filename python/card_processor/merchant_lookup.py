@@ -4,10 +4,12 @@ Merchant Lookup Module
 Fast lookup of known merchants to categories without using AI.
 """
 
+import heapq
 import json
 import logging
 import re
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
@@ -41,6 +43,9 @@ class MerchantMatch:
 class MerchantLookup:
     """Fast merchant to category lookup using preloaded mappings."""
 
+    # Distinct (merchant, entity) lookups remembered per instance
+    LOOKUP_CACHE_SIZE = 4096
+
     def __init__(self, config_dir: Path | str | None = None):
         """Initialize the merchant lookup.
 
@@ -51,6 +56,8 @@ class MerchantLookup:
         self._exact_matches: dict[str, dict] = {}
         self._pattern_matches: list[dict] = []
         self._entity_specific: dict[str, dict] = {}
+        # Merchants recur across statements; cleared whenever mappings change
+        self._cached_lookup = lru_cache(maxsize=self.LOOKUP_CACHE_SIZE)(self._lookup)
         self._load_mappings()
 
     def _load_mappings(self) -> None:
@@ -83,6 +90,9 @@ class MerchantLookup:
     ) -> MerchantMatch | None:
         """Look up a merchant in the mappings.
 
+        Results are cached per (merchant, entity) until the mappings change,
+        so repeated calls return the same MerchantMatch object.
+
         Args:
             merchant: Merchant name to look up
             entity: Optional entity for entity-specific matching
@@ -90,6 +100,10 @@ class MerchantLookup:
         Returns:
             MerchantMatch if found, None otherwise
         """
+        return self._cached_lookup(merchant, entity)
+
+    def _lookup(self, merchant: str, entity: str | None) -> MerchantMatch | None:
+        """Uncached lookup()."""
         if not merchant:
             return None
 
@@ -207,6 +221,7 @@ class MerchantLookup:
             self._pattern_matches.append(mapping)
         else:
             self._exact_matches[merchant_pattern.upper()] = mapping
+        self._cached_lookup.cache_clear()
 
         logger.info(f"Added merchant mapping: {merchant_pattern}")
 
@@ -227,12 +242,11 @@ class MerchantLookup:
             List of possible matches, sorted by confidence
         """
         suggestions = []
-        merchant_upper = merchant.upper()
+        merchant_words = set(merchant.upper().split())
 
         # Look for partial matches in exact mappings
         for known_merchant, mapping in self._exact_matches.items():
             # Check if any word in the merchant matches
-            merchant_words = set(merchant_upper.split())
             known_words = set(known_merchant.split())
 
             common_words = merchant_words & known_words
@@ -250,7 +264,5 @@ class MerchantLookup:
                         entity_hint=mapping.get("entity_hint")
                     ))
 
-        # Sort by confidence
-        suggestions.sort(key=lambda x: x.confidence, reverse=True)
-
-        return suggestions[:5]  # Return top 5 suggestions
+        # Top 5 by confidence, without sorting every partial match
+        return heapq.nlargest(5, suggestions, key=lambda x: x.confidence)
@@ -29,7 +29,7 @@ from bank import (
 )
 from bank.ub_template_generator import TransferType
 from bank.reconciliation import BankTransaction, BookTransaction, MatchType, MatchStatus
-from bank.rpa_fallback import BankCredentials, RPAStatus
+from bank.rpa_fallback import BankCredentials, RPAStatus, parse_balance_cents
 
 
 class TestPayrollEntry:
@@ -105,6 +105,30 @@ class TestTransferBatch:
         assert batch.total_amount == Decimal("25000")
         assert batch.entry_count == 2
 
+    def test_total_amount_tracks_replaced_and_edited_entries(self):
+        """Test total reflects entries replaced in place or re-priced."""
+        batch = TransferBatch(
+            batch_id="TEST_001",
+            transfer_type=TransferType.PAYROLL,
+            entity="solaire",
+            transfer_date=date.today()
+        )
+        batch.entries.append(PayrollEntry(
+            employee_id="E1", employee_name="A", bank_code="123",
+            account_number="1234567890", amount=Decimal("10000")
+        ))
+        assert batch.total_amount == Decimal("10000")
+
+        batch.entries[0] = PayrollEntry(
+            employee_id="E1", employee_name="A", bank_code="123",
+            account_number="1234567890", amount=Decimal("7000")
+        )
+        assert batch.total_amount == Decimal("7000")
+
+        batch.entries[0].amount = Decimal("7250.75")
+        assert batch.total_amount == Decimal("7250.75")
+        assert batch.entries[0].to_dict()["amount"] == "7250.75"
+
     def test_validate_all_entries(self):
         """Test batch validation."""
         batch = TransferBatch(
@@ -224,6 +248,72 @@ entities:
         assert len(errors) == 0
         assert batch.total_amount == Decimal("95000")
 
+    def test_add_entries_from_dataframe(self, generator):
+        """Test vectorized bulk entry addition."""
+        pd = pytest.importorskip("pandas")
+
+        batch = generator.create_batch(
+            transfer_type=TransferType.PAYROLL,
+            entity="solaire",
+            transfer_date=date(2025, 1, 15)
+        )
+
+        df = pd.DataFrame(
+            [
+                {
+                    "employee_id": "E001",
+                    "employee_name": "Juan Dela Cruz",
+                    "bank": "UnionBank",
+                    "account_number": "123-456-7890",
+                    "net_pay": 50000.5,
+                    "department": "Operations",
+                },
+                {
+                    "employee_id": "E002",
+                    "employee_name": "Maria Santos",
+                    "bank": "unknown",
+                    "account_number": "0987654321",
+                    "net_pay": 45000,
+                    "department": "Finance",
+                },
+            ]
+        )
+
+        added, errors = generator.add_entries_from_dataframe(batch, df)
+
+        assert added == 1
+        assert errors == ["Row E002: Unknown bank: unknown"]
+        assert batch.entries[0].account_number == "1234567890"
+        assert batch.entries[0].remarks == "PAYROLL JAN 2025"
+        assert batch.total_amount == Decimal("50000.50")
+
+    def test_add_entries_from_dataframe_missing_values(self, generator):
+        """Test NaN-padded numeric columns keep integer text and gaps are errors."""
+        pd = pytest.importorskip("pandas")
+
+        batch = generator.create_batch(
+            transfer_type=TransferType.PAYROLL,
+            entity="solaire",
+            transfer_date=date(2025, 1, 15)
+        )
+
+        df = pd.DataFrame({
+            "employee_id": ["E001", "E002", "E003"],
+            "employee_name": ["Juan Dela Cruz", None, "Ana Reyes"],
+            "bank": ["unionbank", "bdo", "bdo"],
+            "account_number": [1001234567, None, 1009876543],
+            "net_pay": [50000, 45000, None],
+        })
+
+        added, errors = generator.add_entries_from_dataframe(batch, df)
+
+        assert added == 1
+        assert errors == [
+            "Row E002: Missing account_number",
+            "Row E003: Missing net_pay",
+        ]
+        assert batch.entries[0].account_number == "1001234567"
+
     def test_generate_csv(self, generator):
         """Test CSV template generation."""
         batch = generator.create_batch(
@@ -249,6 +339,61 @@ entities:
         assert "50000.00" in template.content
         assert template.checksum is not None
 
+    def test_write_csv_to_matches_generate_csv(self, generator, tmp_path):
+        """Test streamed CSV output matches the in-memory template."""
+        batch = generator.create_batch(
+            transfer_type=TransferType.PAYROLL,
+            entity="solaire",
+            transfer_date=date.today()
+        )
+
+        for i in range(3):
+            generator.add_payroll_entry(
+                batch=batch,
+                employee_id=f"E00{i}",
+                employee_name=f"Employee, {i}",
+                bank_name="unionbank",
+                account_number="1234567890",
+                amount=Decimal("1000.25")
+            )
+
+        in_memory = generator.generate_csv(batch)
+        streamed = generator.write_csv_to(batch, tmp_path / "out")
+
+        file_path = Path(streamed.metadata["file_path"])
+        assert streamed.content is None
+        assert streamed.checksum == in_memory.checksum
+        assert file_path.name == in_memory.filename
+        assert file_path.read_bytes() == in_memory.content.encode()
+
+    def test_generate_csv_revalidates_edited_entries(self, generator, tmp_path):
+        """Test entries replaced or edited after validation are rejected."""
+        batch = generator.create_batch(
+            transfer_type=TransferType.PAYROLL,
+            entity="solaire",
+            transfer_date=date.today()
+        )
+        generator.add_payroll_entry(
+            batch=batch,
+            employee_id="E001",
+            employee_name="Juan Dela Cruz",
+            bank_name="unionbank",
+            account_number="1234567890",
+            amount=Decimal("50000")
+        )
+        generator.generate_csv(batch)
+
+        batch.entries[0].account_number = "123"
+        with pytest.raises(ValueError):
+            generator.generate_csv(batch)
+
+        batch.entries[0] = PayrollEntry(
+            employee_id="E001", employee_name="Juan Dela Cruz", bank_code="",
+            account_number="1234567890", amount=Decimal("50000")
+        )
+        with pytest.raises(ValueError):
+            generator.write_csv_to(batch, tmp_path / "out")
+
     def test_generate_summary(self, generator):
         """Test summary generation."""
         batch = generator.create_batch(
@@ -505,6 +650,95 @@ class TestBankPortalAutomation:
         assert d["status"] == "success"
         assert d["data"]["file_path"] == "/tmp/statement.csv"
 
+    def test_parse_balance_cents(self):
+        """Test balance text is parsed into int cents."""
+        assert parse_balance_cents("₱1,234,567.89") == 123456789
+        assert parse_balance_cents("PHP 100") == 10000
+        assert parse_balance_cents("(5.5)") == -550
+        assert parse_balance_cents("N/A") is None
+
+        # Hyphens and digits outside the amount are not part of it
+        assert parse_balance_cents("Balance - PHP 1,234.56") == 123456
+        assert parse_balance_cents("As of 2024-01-15: PHP 1,234.56") == 123456
+        assert parse_balance_cents("PHP -1,234.56") == -123456
+        with pytest.raises(ValueError):
+            parse_balance_cents("Acct 1234567890 PHP 1,234.56")
+        with pytest.raises(ValueError):
+            parse_balance_cents("1,234.567")
+
+        result = RPAResult(
+            action=RPAAction.CHECK_BALANCE,
+            status=RPAStatus.SUCCESS,
+            message="ok",
+            data={"balances": {"main": 123456789}}
+        )
+        assert result.decimal_balance() == Decimal("1234567.89")
+        assert result.decimal_balance("other") is None
+
+    def test_check_balance_uses_cache(self, automation):
+        """Test cached balance snapshot skips the browser."""
+        import asyncio
+        import time
+
+        creds = BankCredentials(bank="UnionBank", username="user", password="pw")
+        cached = RPAResult(
+            action=RPAAction.CHECK_BALANCE,
+            status=RPAStatus.SUCCESS,
+            message="Balance check successful",
+            data={"balances": {"main": "1,000.00"}}
+        )
+        BankPortalAutomation._balance_cache[("unionbank", "user", "*")] = (
+            time.monotonic(), cached
+        )
+
+        try:
+            with patch.object(automation, "login", new=AsyncMock()) as login:
+                result = asyncio.run(automation.check_balance(creds))
+
+            assert result == cached
+            login.assert_not_called()
+
+            # Each hit gets its own copy of the snapshot
+            result.data["balances"]["main"] = "0.00"
+            result.screenshots.append("/tmp/shot.png")
+            again = asyncio.run(automation.check_balance(creds))
+            assert again.data == {"balances": {"main": "1,000.00"}}
+            assert again.screenshots == []
+        finally:
+            BankPortalAutomation.clear_balance_cache()
+
+    def test_balance_cache_is_bounded(self, automation):
+        """Test the balance cache evicts least recently used and expired snapshots."""
+        import asyncio
+
+        result = RPAResult(
+            action=RPAAction.CHECK_BALANCE,
+            status=RPAStatus.SUCCESS,
+            message="Balance check successful"
+        )
+
+        try:
+            with patch.object(BankPortalAutomation, "BALANCE_CACHE_SIZE", 2):
+                BankPortalAutomation._store_balance(("bdo", "a", "*"), result)
+                BankPortalAutomation._store_balance(("bdo", "b", "*"), result)
+                BankPortalAutomation._store_balance(("bdo", "c", "*"), result)
+
+            assert list(BankPortalAutomation._balance_cache) == [
+                ("bdo", "b", "*"), ("bdo", "c", "*")
+            ]
+
+            automation.balance_ttl_seconds = 0
+            creds = BankCredentials(bank="BDO", username="b", password="pw")
+            failed = RPAResult(
+                action=RPAAction.LOGIN, status=RPAStatus.FAILED, message="no"
+            )
+            with patch.object(automation, "login", new=AsyncMock(return_value=failed)):
+                assert asyncio.run(automation.check_balance(creds)) is failed
+
+            assert ("bdo", "b", "*") not in BankPortalAutomation._balance_cache
+        finally:
+            BankPortalAutomation.clear_balance_cache()
+
 
 class TestBankCredentials:
     """Tests for BankCredentials dataclass."""
@@ -5,6 +5,7 @@ Tests for budget variance calculation, threshold checking,
 historical analysis, and report generation.
 """
 
+import json
 import pytest
 from datetime import datetime
 from decimal import Decimal
@@ -130,6 +131,26 @@ class TestVarianceItem:
         assert d["variance_amount"] == 25000.0
         assert d["utilization_percent"] == 75.0
 
+    def test_status_set_at_construction(self):
+        """Test status fields are derived from utilization on creation."""
+        statuses = []
+        for utilization in (69.99, 70.0, 90.0, 100.0):
+            item = VarianceItem(
+                entity="solaire",
+                account_code="6100",
+                account_name="Office Supplies",
+                category="expense",
+                budget_amount=Decimal("100000"),
+                actual_amount=Decimal(str(utilization * 1000)),
+                variance_amount=Decimal("0"),
+                variance_percent=utilization - 100,
+                utilization_percent=utilization,
+                is_over_budget=utilization > 100
+            )
+            statuses.append((item.status_code, item.status))
+
+        assert statuses == [(0, "ok"), (1, "warning"), (2, "critical"), (3, "exceeded")]
+
 
 class TestVarianceCalculator:
     """Tests for VarianceCalculator class."""
@@ -202,6 +223,77 @@ thresholds:
         assert report.summary["total_actual"] == 135000.0
         assert report.summary["accounts_over_budget"] == 1
 
+    def test_past_short_month_has_no_days_remaining(self, calculator):
+        """Test a closed 28-day month is projected at its actual spend."""
+        report = calculator.calculate_report(
+            "solaire", "2023-02",
+            [{"entity": "solaire", "account_code": "6100", "budget_amount": 1000}],
+            [{"entity": "solaire", "account_code": "6100", "total_amount": 560}],
+        )
+
+        item = report.items[0]
+        assert item.days_remaining == 0
+        assert item.projected_month_end == Decimal("560")
+
+    def test_duplicate_actual_records_are_summed(self, calculator):
+        """Test actual records for the same account are added together."""
+        report = calculator.calculate_report(
+            "solaire", "2023-02",
+            [{"entity": "solaire", "account_code": "6100", "budget_amount": 1000}],
+            [
+                {"entity": "solaire", "account_code": "6100", "total_amount": 300},
+                {"entity": "solaire", "account_code": "6100", "total_amount": "250.50"},
+                {"entity": "okada", "account_code": "6100", "total_amount": 999},
+            ],
+        )
+
+        assert report.items[0].actual_amount == Decimal("550.50")
+        assert report.summary["total_actual"] == 550.5
+
+    def test_report_to_json(self, calculator):
+        """Test JSON output matches the to_dict payload."""
+        report = calculator.calculate_report(
+            "solaire",
+            "2023-02",
+            [
+                {
+                    "entity": "solaire",
+                    "account_code": "6100",
+                    "account_name": "Café",
+                    "budget_amount": 1000,
+                }
+            ],
+            [{"entity": "solaire", "account_code": "6100", "total_amount": "950.25"}],
+        )
+
+        assert json.loads(report.to_json()) == report.to_dict()
+
+    def test_compare_periods(self, calculator):
+        """Test period comparison only matches accounts present in both reports."""
+        budget = [
+            {"entity": "solaire", "account_code": code, "budget_amount": 1000}
+            for code in ("6100", "6200", "6300", "6400")
+        ]
+        report1 = calculator.calculate_report("solaire", "2024-01", budget, [
+            {"entity": "solaire", "account_code": "6100", "total_amount": 900},
+            {"entity": "solaire", "account_code": "6200", "total_amount": 500},
+            {"entity": "solaire", "account_code": "6300", "total_amount": 1200},
+        ])
+        report2 = calculator.calculate_report("solaire", "2024-02", budget[:3], [
+            {"entity": "solaire", "account_code": "6100", "total_amount": 1100},
+            {"entity": "solaire", "account_code": "6200", "total_amount": 520},
+            {"entity": "solaire", "account_code": "6300", "total_amount": 800},
+        ])
+
+        comparison = calculator.compare_periods(report1, report2)
+
+        assert comparison["period1"] == "2024-01"
+        assert comparison["period2"] == "2024-02"
+        assert [c["account"] for c in comparison["improved"]] == ["6300"]
+        assert [c["account"] for c in comparison["worsened"]] == ["6100"]
+        assert [i["account_code"] for i in comparison["new_issues"]] == ["6100"]
+        assert [i["account_code"] for i in comparison["resolved"]] == ["6300"]
+
 
 class TestThresholdChecker:
     """Tests for ThresholdChecker class."""
@@ -388,6 +480,97 @@ cooldown:
         alert = checker.check_variance(item)
         assert alert is not None
 
+    def test_account_override_thresholds(self, checker):
+        """Test per-account threshold overrides are applied."""
+        checker.account_overrides = {"6100": {"critical": 80}}
+        checker._threshold_cache.clear()
+
+        item = VarianceItem(
+            entity="solaire",
+            account_code="6100",
+            account_name="Office Supplies",
+            category="expense",
+            budget_amount=Decimal("100000"),
+            actual_amount=Decimal("85000"),
+            variance_amount=Decimal("15000"),
+            variance_percent=-15.0,
+            utilization_percent=85.0,
+            is_over_budget=False
+        )
+
+        alert = checker.check_variance(item)
+
+        assert alert.threshold_type == "critical"
+        assert alert.threshold_percent == 80
+        assert checker._threshold_cache[("solaire", "6100")] == (70, 80, 100)
+
+    def test_cooldown_uses_check_time(self, checker):
+        """Test cooldown expiry is measured from the supplied check time."""
+        item = VarianceItem(
+            entity="solaire",
+            account_code="6100",
+            account_name="Office Supplies",
+            category="expense",
+            budget_amount=Decimal("100000"),
+            actual_amount=Decimal("95000"),
+            variance_amount=Decimal("5000"),
+            variance_percent=-5.0,
+            utilization_percent=95.0,
+            is_over_budget=False
+        )
+        start = datetime(2025, 1, 15, 9, 0).timestamp()
+
+        alert = checker.check_variance(item, now_ts=start)
+        assert alert.triggered_at == datetime(2025, 1, 15, 9, 0)
+        assert checker.check_variance(item, now_ts=start + 3600) is None
+        assert checker.check_variance(item, now_ts=start + 24 * 3600) is not None
+
+    def test_check_result_to_json(self, checker):
+        """Test check results serialize alerts once with per-severity counts."""
+        item = VarianceItem(
+            entity="solaire",
+            account_code="6100",
+            account_name="Office Supplies",
+            category="expense",
+            budget_amount=Decimal("100000"),
+            actual_amount=Decimal("110000"),
+            variance_amount=Decimal("-10000"),
+            variance_percent=10.0,
+            utilization_percent=110.0,
+            is_over_budget=True
+        )
+        report = VarianceReport(
+            entity="solaire",
+            period="2025-01",
+            generated_at=datetime.now(),
+            items=[item],
+        )
+
+        result = checker.check_report(report)
+        payload = json.loads(result.to_json())
+
+        assert payload == result.to_dict()
+        assert payload["alert_count"] == 1
+        assert payload["alerts"][0]["threshold_type"] == "exceeded"
+        assert payload["by_severity"] == {"high": 1, "medium": 0, "low": 0}
+
+    def test_clear_cooldown_with_underscored_codes(self, checker):
+        """Test cooldown clearing for entity/account codes containing underscores."""
+        checker._alert_history = {
+            ("solaire_ph", "6100_A", "warning"): 0.0,
+            ("solaire_ph", "6200", "warning"): 0.0,
+            ("okada", "6100_A", "critical"): 0.0,
+        }
+
+        checker.clear_cooldown(entity="solaire_ph", account_code="6100_A")
+        assert set(checker._alert_history) == {
+            ("solaire_ph", "6200", "warning"),
+            ("okada", "6100_A", "critical"),
+        }
+
+        checker.clear_cooldown(account_code="6100_A")
+        assert set(checker._alert_history) == {("solaire_ph", "6200", "warning")}
+
 
 class TestBudgetReportGenerator:
     """Tests for BudgetReportGenerator class."""
@@ -444,6 +627,39 @@ class TestBudgetReportGenerator:
         assert "90.0%" in message
         assert "Travel" in message
 
+    def test_format_variance_for_telegram_clean_day(self, generator):
+        """Test the short form when no account needs attention."""
+        report = VarianceReport(
+            entity="solaire",
+            period="2025-01",
+            generated_at=datetime.now(),
+            items=[
+                VarianceItem(
+                    entity="solaire",
+                    account_code="6100",
+                    account_name="Office Supplies",
+                    category="expense",
+                    budget_amount=Decimal("100000"),
+                    actual_amount=Decimal("40000"),
+                    variance_amount=Decimal("60000"),
+                    variance_percent=-60.0,
+                    utilization_percent=40.0,
+                    is_over_budget=False
+                )
+            ],
+            summary={"overall_utilization": 40.0}
+        )
+
+        message = generator.format_variance_for_telegram(report)
+
+        assert message.count("\n") == 2
+        assert "SOLAIRE" in message
+        assert "All accounts within budget" in message
+        assert "40.0%" in message
+        assert "Office Supplies" in generator.format_variance_for_telegram(
+            report, include_all=True
+        )
+
     def test_format_alerts_for_telegram(self, generator):
         """Test Telegram alert formatting."""
         alerts = [
@@ -507,6 +723,106 @@ class TestBudgetReportGenerator:
         assert "75.0%" in message
         assert "Travel" in message
 
+    def test_generate_variance_excel(self, generator, tmp_path):
+        """Test Excel export layout."""
+        from openpyxl import load_workbook
+
+        report = VarianceReport(
+            entity="solaire",
+            period="2025-01",
+            generated_at=datetime(2025, 1, 31),
+            items=[
+                VarianceItem(
+                    entity="solaire",
+                    account_code="6100",
+                    account_name="Office Supplies",
+                    category="opex",
+                    budget_amount=Decimal("100000"),
+                    actual_amount=Decimal("110000"),
+                    variance_amount=Decimal("-10000"),
+                    variance_percent=-10.0,
+                    utilization_percent=110.0,
+                    is_over_budget=True,
+                )
+            ],
+            summary={
+                "total_budget": 100000,
+                "total_actual": 110000,
+                "overall_utilization": 110.0,
+            },
+        )
+
+        assert report.items[0].status_code == 3
+        assert report.items[0].status == "exceeded"
+
+        path = generator.generate_variance_excel(
+            report, tmp_path / "out" / "variance.xlsx"
+        )
+        ws = load_workbook(path)["Budget Variance"]
+
+        assert "A1:H1" in ws.merged_cells
+        assert ws["A3"].value == "Entity"
+        assert ws["C4"].value == "Office Supplies"
+        assert ws["D4"].number_format == "₱#,##0.00"
+        assert ws["H4"].value == "EXCEEDED"
+        assert ws["H4"].fill.fgColor.rgb == "00FFC7CE"
+        assert ws["A7"].value == "Summary"
+        assert ws["B8"].value == 100000
+
+    def test_generate_variance_excels_concurrently(self, generator, tmp_path):
+        """Test async batch Excel generation keeps job order."""
+        import asyncio
+
+        jobs = [
+            (
+                VarianceReport(
+                    entity=entity, period="2025-01", generated_at=datetime(2025, 1, 31)
+                ),
+                tmp_path / f"{entity}.xlsx",
+            )
+            for entity in ["solaire", "okada", "cod"]
+        ]
+
+        paths = asyncio.run(generator.generate_variance_excels(jobs, max_concurrency=2))
+
+        assert paths == [path for _, path in jobs]
+        assert all(path.exists() for path in paths)
+
+    def test_format_suggestions_for_telegram(self, generator):
+        """Test that only the largest significant changes are listed."""
+        suggestions = [
+            BudgetSuggestion(
+                account_code=code,
+                account_name=name,
+                current_budget=Decimal("100000"),
+                recommended_budget=Decimal(str(100000 + change * 1000)),
+                change_percent=float(change),
+                rationale="",
+                confidence=0.8,
+                risk_level="low",
+                historical_avg=Decimal("0"),
+                historical_max=Decimal("0")
+            )
+            for code, name, change in [
+                ("6100", "Office Supplies", 5),
+                ("6200", "Travel", -40),
+                ("6300", "Utilities", 25),
+                ("6400", "Meals", 15),
+            ]
+        ]
+        result = BudgetAnalysisResult(
+            entity="solaire",
+            target_period="2025-01",
+            analysis_date=datetime(2025, 1, 1),
+            suggestions=suggestions
+        )
+
+        message = generator.format_suggestions_for_telegram(result, max_items=2)
+
+        assert message.index("Travel") < message.index("Utilities")
+        assert "Meals" not in message
+        assert "Office Supplies" not in message
+
 
 class TestHistoricalAnalyzer:
     """Tests for HistoricalAnalyzer class."""
@@ -514,9 +830,9 @@ class TestHistoricalAnalyzer:
     @pytest.fixture
     def mock_anthropic(self):
         """Create mock Anthropic client."""
-        with patch("budget.historical_analyzer.anthropic") as mock:
+        with patch("anthropic.Anthropic") as mock:
             mock_client = Mock()
-            mock.Anthropic.return_value = mock_client
+            mock.return_value = mock_client
 
             mock_response = Mock()
             mock_response.content = [Mock(text='''
@@ -597,6 +913,11 @@ entities:
         assert result.suggestions[0].account_code == "6100"
         assert result.suggestions[0].recommended_budget == Decimal("85000")
 
+        # Static instructions go in a cacheable system block
+        kwargs = analyzer.client.messages.create.call_args.kwargs
+        assert kwargs["system"][0]["cache_control"] == {"type": "ephemeral"}
+        assert "Office Supplies" in kwargs["messages"][0]["content"]
+
     def test_statistical_fallback(self, analyzer, tmp_path):
         """Test statistical fallback when Claude fails."""
         # Make Claude fail
@@ -627,6 +948,136 @@ entities:
         assert len(result.suggestions) == 1
         assert "statistical analysis" in result.key_insights[0].lower()
 
+    def test_analyze_batch(self, analyzer):
+        """Test batch analysis with one succeeded and one errored request."""
+        history = {
+            "6100": [
+                {"month": "2024-11", "name": "Office Supplies", "amount": 80000},
+                {"month": "2024-12", "name": "Office Supplies", "amount": 85000},
+            ]
+        }
+        text = json.dumps(
+            {"recommendations": [{"account_code": "6100", "recommended_budget": 90000}]}
+        )
+        batches = analyzer.client.messages.batches
+        batches.create.return_value = Mock(id="batch-1", processing_status="ended")
+        batches.results.return_value = [
+            Mock(custom_id="analysis-1", result=Mock(type="errored")),
+            Mock(
+                custom_id="analysis-0",
+                result=Mock(
+                    type="succeeded", message=Mock(content=[Mock(text=text)])
+                ),
+            ),
+        ]
+
+        results = analyzer.analyze_batch(
+            [
+                {
+                    "entity": "solaire",
+                    "target_month": "2025-01",
+                    "historical_data": history,
+                },
+                {
+                    "entity": "okada",
+                    "target_month": "2025-01",
+                    "historical_data": history,
+                },
+            ]
+        )
+
+        requests = batches.create.call_args.kwargs["requests"]
+        assert [r["custom_id"] for r in requests] == ["analysis-0", "analysis-1"]
+        assert requests[0]["params"]["system"][0]["text"]
+        assert results[0].entity == "solaire"
+        assert results[0].suggestions[0].recommended_budget == Decimal("90000")
+        assert results[1].entity == "okada"
+        assert "statistical analysis" in results[1].key_insights[0].lower()
+
+    def test_analyze_batch_malformed_result(self, analyzer):
+        """Test a malformed result falls back without losing the other results."""
+        history = {
+            "6100": [
+                {"month": "2024-11", "name": "Office Supplies", "amount": 80000},
+                {"month": "2024-12", "name": "Office Supplies", "amount": 85000},
+            ]
+        }
+
+        def succeeded(custom_id, text):
+            return Mock(
+                custom_id=custom_id,
+                result=Mock(type="succeeded", message=Mock(content=[Mock(text=text)]))
+            )
+
+        batches = analyzer.client.messages.batches
+        batches.create.return_value = Mock(id="batch-1", processing_status="ended")
+        def recommendation(budget):
+            suggestion = {"account_code": "6100", "recommended_budget": budget}
+            return json.dumps({"recommendations": [suggestion]})
+
+        batches.results.return_value = [
+            succeeded("analysis-0", recommendation(None)),
+            succeeded("analysis-1", "[]"),
+            succeeded("analysis-2", recommendation(90000)),
+        ]
+
+        results = analyzer.analyze_batch([
+            {"entity": entity, "target_month": "2025-01", "historical_data": history}
+            for entity in ("solaire", "okada", "ttlc")
+        ])
+
+        assert "statistical analysis" in results[0].key_insights[0].lower()
+        assert "statistical analysis" in results[1].key_insights[0].lower()
+        assert results[2].suggestions[0].recommended_budget == Decimal("90000")
+
+    def test_claude_response_fences_stripped(self, analyzer):
+        """Test that markdown code fences around the JSON are removed."""
+        analyzer.client.messages.create.return_value = Mock(
+            content=[Mock(text='```json\n{"recommendations": []}\n```')]
+        )
+
+        assert analyzer._get_claude_analysis(
+            {
+                "entity_name": "Solaire",
+                "target_month": "2025-01",
+                "entity_type": "gaming",
+                "growth_rate": 0.0,
+                "inflation_rate": 0.05,
+                "seasonal_notes": "",
+                "historical_data": {},
+            }
+        ) == {"recommendations": []}
+
+    def test_calculate_statistics(self, analyzer):
+        """Test per-account statistics."""
+        stats = analyzer._calculate_statistics(
+            {
+                "6100": [
+                    {"amount": 100},
+                    {"amount": 100},
+                    {"amount": 200},
+                    {"amount": 200},
+                ],
+                "6200": [],
+            }
+        )
+
+        assert stats["6100"]["avg"] == 150.0
+        assert stats["6100"]["max"] == 200.0
+        assert stats["6100"]["min"] == 100.0
+        assert stats["6100"]["trend"] == 1.0
+        assert stats["6100"]["volatility"] == pytest.approx(1 / 3)
+        assert stats["6200"]["months"] == 0
+
+    def test_recommend_budget(self):
+        """Test statistical recommendation caps and rounding."""
+        from budget.historical_analyzer import _recommend_budget
+
+        assert _recommend_budget(100000.0, 0.0, 0.0, 0.10) == 110000
+        # Trend capped at 20%, volatility buffer capped at 15%
+        assert _recommend_budget(100000.0, 0.5, 1.0, 0.0) == 138000
+        assert _recommend_budget(0.0, 0.0, 0.0, 0.10) == 0
+
 
 class TestBudgetSuggestion:
     """Tests for BudgetSuggestion dataclass."""
@@ -688,3 +1139,24 @@ class TestBudgetAnalysisResult:
         assert d["entity"] == "solaire"
         assert d["total_change_percent"] == 10.0
         assert len(d["key_insights"]) == 2
+
+
+class TestYamlCache:
+    """Tests for the shared YAML config cache."""
+
+    def test_reuses_parsed_config_until_file_changes(self, tmp_path):
+        """Test that the parsed document is reused until the file changes."""
+        from budget._yaml_cache import load_yaml_cached
+
+        config_file = tmp_path / "budget_thresholds.yaml"
+        config_file.write_text("budget_suggestions:\n  lookback_months: 6\n")
+
+        first = load_yaml_cached(config_file)
+        assert load_yaml_cached(config_file) is first
+
+        config_file.write_text("budget_suggestions:\n  lookback_months: 12\n")
+        assert (
+            load_yaml_cached(config_file)["budget_suggestions"]["lookback_months"] == 12
+        )
+
+        assert load_yaml_cached(tmp_path / "missing.yaml") is None
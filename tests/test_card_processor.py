@@ -11,6 +11,7 @@ from decimal import Decimal
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
 from io import StringIO
+import hashlib
 import json
 
 import sys
@@ -23,7 +24,7 @@ from card_processor.csv_parsers.gcash import GCashParser
 from card_processor.csv_parsers.generic import GenericParser, detect_and_parse
 from card_processor.merchant_lookup import MerchantLookup, MerchantMatch
 from card_processor.duplicate_detector import DuplicateDetector, DuplicateMatch
-from card_processor.categorizer import TransactionCategorizer, CategorizedTransaction
+from card_processor.categorizer import TransactionCategorizer, ClassifiedTransaction
 
 
 class TestParsedTransaction:
@@ -63,6 +64,42 @@ class TestParsedTransaction:
         assert txn.amount == Decimal("1500.50")
         assert txn.reference == "REF123"
 
+    def test_hash_identifies_same_transaction(self):
+        """Test the duplicate-detection hash depends on date, description and amount."""
+        txn = ParsedTransaction(
+            date=datetime(2025, 1, 15),
+            description="PURCHASE - STORE ABC",
+            amount=Decimal("1500.50"),
+            reference="REF123"
+        )
+        same = ParsedTransaction(
+            date=datetime(2025, 1, 15),
+            description="PURCHASE - STORE ABC",
+            amount=Decimal("1500.50"),
+            reference="REF999"
+        )
+        other = ParsedTransaction(
+            date=datetime(2025, 1, 15),
+            description="PURCHASE - STORE ABC",
+            amount=Decimal("1500.51")
+        )
+
+        assert len(txn.hash) == 16
+        assert txn.hash == same.hash
+        assert txn.hash != other.hash
+
+    def test_hash_computed_once(self):
+        """Test the hash is cached after first access."""
+        txn = ParsedTransaction(date=datetime(2025, 1, 15), amount=Decimal("100"))
+
+        with patch(
+            "card_processor.csv_parsers.base.hashlib.blake2b", wraps=hashlib.blake2b
+        ) as blake2b:
+            first = txn.hash
+            assert txn.hash == first
+
+        assert blake2b.call_count == 1
+
 
 class TestUnionBankParser:
     """Tests for UnionBank CSV parser."""
@@ -153,6 +190,108 @@ class TestBDOParser:
         assert txn.amount == Decimal("1500.00")  # Converted to positive
         assert "SM SUPERMARKET" in txn.description
 
+    def test_columns_resolved_per_file(self, parser):
+        """Test column mappings are re-resolved for each statement layout."""
+        single = parser.parse_content(
+            "Posting Date,Description,Amount\n"
+            "15-Jan-2025,SM SUPERMARKET,1500.00\n"
+        )
+        split = parser.parse_content(
+            "POST DATE,Particulars,Debit,Credit\n"
+            "16-Jan-2025,MERALCO,2500.00,\n"
+            "17-Jan-2025,PAYMENT,,3000.00\n"
+        )
+
+        assert [t.amount for t in single.transactions] == [Decimal("1500.00")]
+        assert [t.amount for t in split.transactions] == [
+            Decimal("2500.00"),
+            Decimal("-3000.00"),
+        ]
+        assert [t.description for t in split.transactions] == ["MERALCO", "PAYMENT"]
+
+    def test_statement_preamble_skipped(self, parser):
+        """Test header lines before the column row are skipped."""
+        content = (
+            "BDO Credit Card Statement 2025\r\n"
+            "Card Number: XXXX-XXXX-XXXX-4821\r\n"
+            "\r\n"
+            "Posting Date,Description,Amount\r\n"
+            '15-Jan-2025,"SM SUPERMARKET, MAKATI","1,500.00"\r\n'
+            "01/16,GRAB,250.00"
+        )
+
+        result = parser.parse_content(content)
+
+        assert [t.description for t in result.transactions] == [
+            "SM SUPERMARKET, MAKATI",
+            "GRAB",
+        ]
+        assert [t.amount for t in result.transactions] == [
+            Decimal("1500.00"),
+            Decimal("250.00"),
+        ]
+        assert result.transactions[1].date == datetime(2025, 1, 16)
+
+    def test_repeated_dates_parsed_once(self, parser):
+        """Test each distinct date string is only run through the format list once."""
+        content = "Posting Date,Description,Amount\n" + "".join(
+            f"15-Jan-2025,PURCHASE {i},100.00\n" for i in range(5)
+        )
+
+        with patch.object(
+            parser, "_parse_date_formats", wraps=parser._parse_date_formats
+        ) as parse:
+            result = parser.parse_content(content)
+
+        assert len(result.transactions) == 5
+        assert all(t.date == datetime(2025, 1, 15) for t in result.transactions)
+        assert parse.call_count == 1
+
+    def test_summary_totals(self, parser):
+        """Test the summary agrees with the ParseResult total properties."""
+        result = parser.parse_content(
+            "Posting Date,Description,Amount\n"
+            "15-Jan-2025,SM SUPERMARKET,1500.10\n"
+            "16-Jan-2025,PAYMENT,(3000.00)\n"
+            "17-Jan-2025,GRAB,250.25\n"
+        )
+
+        assert result.total_debits == Decimal("1750.35")
+        assert result.total_credits == Decimal("3000.00")
+        assert result.summary == {
+            "total_transactions": 3,
+            "total_debits": 1750.35,
+            "total_credits": 3000.0,
+            "net_amount": -1249.65
+        }
+
+    def test_parse_amount_forms(self, parser):
+        """Test plain, signed and currency-prefixed amounts keep their exact value."""
+        assert str(parser._parse_amount("1,500.50")) == "1500.50"
+        assert parser._parse_amount("(32,550.21)") == Decimal("-32550.21")
+        assert parser._parse_amount("₱ 250.00 CR") == Decimal("-250.00")
+        assert parser._parse_amount("-1,000") == Decimal("-1000")
+        assert parser._parse_amount("  ") == Decimal("0")
+
+        with pytest.raises(ValueError):
+            parser._parse_amount("1.2.3")
+
+    def test_parse_date_matches_strptime(self, parser):
+        """Test the DD-Mon-YYYY fast path agrees with the format list."""
+        for date_str in (
+            "15-Jan-2025",
+            "5-SEP-2024",
+            "29-feb-2024",
+            "01/15/2025",
+            "01/15",
+        ):
+            expected = BaseCSVParser._parse_date_formats(parser, date_str, 2024)
+            assert parser._parse_date_formats(date_str, 2024) == expected
+
+        for date_str in ("29-Feb-2023", "15-Sept-2025", "15-Jan-25x"):
+            with pytest.raises(ValueError):
+                parser._parse_date_formats(date_str, 2024)
+
 
 class TestGCashParser:
     """Tests for GCash CSV parser."""
@@ -198,6 +337,39 @@ class TestGCashParser:
         assert types[1] == "income"   # Cash In
         assert types[2] == "expense"  # Pay Bills
 
+    def test_alternate_headers_resolved_per_file(self, parser):
+        """Test each export's own header aliases are used."""
+        first = parser.parse_content(
+            "Date & Time,Type,Description,Reference Number,Amount\n"
+            "2025-01-15,Payment,Payment to JOLLIBEE,GC1,250.00\n"
+        )
+        second = parser.parse_content(
+            "Transaction Date,Transaction Type,Details,Ref No,Amount,Status\n"
+            "2025-01-16,Cash Out,Cash Out - 7-ELEVEN,GC2,1000.00,SUCCESS\n"
+            "2025-01-17,Payment,Payment to GRAB,GC3,300.00,FAILED\n"
+        )
+
+        assert [t.merchant for t in first.transactions] == ["JOLLIBEE"]
+        assert [t.merchant for t in second.transactions] == ["7-ELEVEN"]
+        assert second.transactions[0].reference == "GC2"
+        assert second.transactions[0].description == "CASH OUT - Cash Out - 7-ELEVEN"
+
+    def test_last_date_format_tried_first(self, parser):
+        """Test the matching format is remembered only for exclusive format lists."""
+        with patch("card_processor.csv_parsers.base.datetime") as mock_datetime:
+            mock_datetime.strptime.side_effect = datetime.strptime
+            parser._parse_date_formats("2025-01-15 14:30:00", None)
+            parser._parse_date_formats("2025-01-16 09:00:00", None)
+
+        # Three failed formats for the first date, then a direct hit
+        assert mock_datetime.strptime.call_count == 5
+
+        # The base list has both month-first and day-first formats, so
+        # remembering day-first would misread the second date
+        generic = GenericParser()
+        assert generic._parse_date_formats("25/01/2025", None) == datetime(2025, 1, 25)
+        assert generic._parse_date_formats("01/02/2025", None) == datetime(2025, 1, 2)
+
 
 class TestGenericParser:
     """Tests for Generic CSV parser with auto-detection."""
@@ -225,6 +397,33 @@ class TestGenericParser:
         result = parser.parse(csv_content)
         assert result.transactions[0].amount == Decimal("500.00")
 
+    def test_ragged_rows(self, parser):
+        """Test short, long and blank rows are handled like csv.DictReader rows."""
+        result = parser.parse_content(
+            "Date,Description,Amount\n"
+            "2025-01-15,SHORT\n"
+            "\n"
+            "2025-01-16,LONG,250.00,extra\n"
+            "2025-01-17,FULL,100.00\n"
+        )
+
+        assert result.errors == []
+        assert [t.description for t in result.transactions] == ["LONG", "FULL"]
+        assert result.transactions[0].raw_data == {
+            "Date": "2025-01-16",
+            "Description": "LONG",
+            "Amount": "250.00",
+            None: ["extra"],
+        }
+
+    def test_date_cache_reset_per_statement(self, parser):
+        """Test a reused parser does not carry dates over between statements."""
+        parser.parse_content("Date,Description,Amount\n2025-01-15,A,100.00\n")
+        result = parser.parse_content("Date,Description,Amount\n2025-02-01,B,50.00\n")
+
+        assert result.transactions[0].date == datetime(2025, 2, 1)
+        assert list(parser._date_cache) == [("2025-02-01", None)]
+
     def test_detect_and_parse_function(self):
         """Test the detect_and_parse convenience function."""
         unionbank_csv = """Transaction Date,Posting Date,Description,Reference Number,Debit,Credit,Balance
@@ -322,6 +521,23 @@ class TestMerchantLookup:
         assert match is not None
         assert match.account_code == "6120"
 
+    def test_suggest_category_top_five(self, lookup):
+        """Test suggestions are the five most confident partial matches."""
+        for i in range(8):
+            lookup.add_mapping(
+                f"CAFE {i}", f"61{i}0", f"Cafe {i}", "expense", confidence=0.1 * (i + 1)
+            )
+
+        suggestions = lookup.suggest_category("CAFE MANILA", 250.0)
+
+        assert [s.account_code for s in suggestions] == [
+            "6170",
+            "6160",
+            "6150",
+            "6140",
+            "6130",
+        ]
+
 
 class TestDuplicateDetector:
     """Tests for DuplicateDetector class."""
@@ -501,7 +717,7 @@ expense:
 
         result = categorizer.categorize(txn, entity="solaire")
 
-        assert isinstance(result, CategorizedTransaction)
+        assert isinstance(result, ClassifiedTransaction)
         assert result.account_code == "6110"
         assert result.account_name == "Meals & Entertainment"
         assert result.classification_method == "lookup"
@@ -518,7 +734,7 @@ expense:
 
         result = categorizer.categorize(txn, entity="solaire")
 
-        assert isinstance(result, CategorizedTransaction)
+        assert isinstance(result, ClassifiedTransaction)
         assert result.classification_method == "claude"
 
     def test_batch_categorize(self, categorizer):
@@ -543,6 +759,264 @@ expense:
         assert len(results) == 2
         assert results[0].classification_method == "lookup"
 
+    def test_classify_batch_looks_up_each_merchant_once(self, categorizer):
+        """Test repeated merchants in a batch share one lookup."""
+        txns = [
+            ParsedTransaction(
+                date=datetime(2025, 1, 15 + i % 3),
+                amount=Decimal("500.00"),
+                merchant="JOLLIBEE",
+                description="JOLLIBEE MAKATI"
+            )
+            for i in range(6)
+        ]
+        lookup = categorizer.merchant_lookup.lookup
+
+        with patch.object(
+            categorizer.merchant_lookup, "lookup", wraps=lookup
+        ) as mock_lookup:
+            result = categorizer.classify_batch(txns, entity="solaire")
+
+        assert mock_lookup.call_count == 1
+        assert result.stats["by_lookup"] == 6
+        assert len({id(ct.classification) for ct in result.classified}) == 6
+
+    def test_lookup_cached_across_batches(self, categorizer):
+        """Test merchant lookups are reused across batches until mappings change."""
+        txn = ParsedTransaction(
+            date=datetime(2025, 1, 15),
+            amount=Decimal("500.00"),
+            merchant="JOLLIBEE",
+            description="JOLLIBEE MAKATI"
+        )
+        cache = categorizer.merchant_lookup._cached_lookup
+
+        categorizer.classify_batch([txn], entity="solaire")
+        categorizer.classify_batch([txn], entity="solaire")
+        categorizer.classify_batch([txn], entity="okada")
+        assert (cache.cache_info().hits, cache.cache_info().misses) == (1, 2)
+
+        categorizer.merchant_lookup.add_mapping(
+            "JOLLIBEE", "6120", "Transportation", "expense", confidence=1.0
+        )
+        result = categorizer.classify_batch([txn], entity="solaire")
+        assert cache.cache_info().misses == 1
+        assert result.classified[0].classification.account_code == "6120"
+
+    def test_classify_batch_async(self, categorizer, mock_anthropic):
+        """Test async batch classification keeps input order across Claude batches."""
+        import asyncio
+        from unittest.mock import AsyncMock
+
+        async_client = mock_anthropic.AsyncAnthropic.return_value
+        async_client.messages.create = AsyncMock(
+            return_value=categorizer.client.messages.create.return_value
+        )
+        txns = [
+            ParsedTransaction(
+                date=datetime(2025, 1, 15),
+                amount=Decimal("100.00") * (i + 1),
+                merchant="JOLLIBEE" if i == 0 else f"UNKNOWN {i}",
+                description=f"PURCHASE {i}"
+            )
+            for i in range(5)
+        ]
+
+        result = asyncio.run(
+            categorizer.classify_batch_async(
+                txns, entity="solaire", batch_size=1, max_concurrency=2
+            )
+        )
+
+        assert async_client.messages.create.await_count == 4
+        assert [ct.transaction for ct in result.classified] == txns
+        assert result.stats["by_lookup"] == 1
+        assert result.stats["by_claude"] == 4
+
+    def test_classify_retries_rate_limit(self, categorizer, mock_anthropic):
+        """Test a 429 is retried after the server's retry-after delay, up to a bound."""
+        class RateLimitError(Exception):
+            response = Mock(headers={"retry-after": "2"})
+
+        mock_anthropic.RateLimitError = RateLimitError
+        create = categorizer.client.messages.create
+        response = create.return_value
+        create.side_effect = [RateLimitError(), response]
+        txn = ParsedTransaction(
+            date=datetime(2025, 1, 15), amount=Decimal("100.00"), merchant="UNKNOWN"
+        )
+
+        with patch("card_processor.categorizer.time.sleep") as sleep:
+            classifications = categorizer._classify_with_claude([txn], "solaire")
+
+            assert classifications[0].account_code == "6110"
+            sleep.assert_called_once_with(2.0)
+
+            create.side_effect = RateLimitError()
+            create.reset_mock()
+            assert categorizer._classify_with_claude([txn], "solaire") == [None]
+            assert create.call_count == categorizer.RATE_LIMIT_RETRIES + 1
+
+    def test_classify_batch_deferred(self, categorizer):
+        """Test batch classification with one succeeded and one errored request."""
+        txns = [
+            ParsedTransaction(
+                date=datetime(2025, 1, 15),
+                amount=Decimal("100.00") * (i + 1),
+                merchant="JOLLIBEE" if i == 0 else f"UNKNOWN {i}",
+                description=f"PURCHASE {i}"
+            )
+            for i in range(5)
+        ]
+        batches = categorizer.client.messages.batches
+        batches.create.return_value = Mock(id="batch-1", processing_status="ended")
+        batches.results.return_value = [
+            Mock(custom_id="classify-1", result=Mock(type="errored")),
+            Mock(
+                custom_id="classify-0",
+                result=Mock(
+                    type="succeeded",
+                    message=Mock(
+                        content=[
+                            Mock(
+                                text=json.dumps(
+                                    [
+                                        {
+                                            "account_code": "6120",
+                                            "account_name": "Transportation",
+                                            "confidence": 0.8,
+                                        },
+                                        {
+                                            "account_code": "6100",
+                                            "account_name": "Office Supplies",
+                                            "confidence": 0.7,
+                                        },
+                                    ]
+                                )
+                            )
+                        ]
+                    ),
+                ),
+            ),
+        ]
+
+        result = categorizer.classify_batch_deferred(
+            txns, entity="solaire", batch_size=2
+        )
+
+        requests = batches.create.call_args.kwargs["requests"]
+        assert [r["custom_id"] for r in requests] == ["classify-0", "classify-1"]
+        assert requests[0]["params"]["model"] == categorizer.model
+        assert [ct.transaction for ct in result.classified] == txns[:3]
+        assert [ct.classification.account_code for ct in result.classified[1:]] == [
+            "6120",
+            "6100",
+        ]
+        assert result.unclassified == txns[3:]
+        assert result.stats["by_claude"] == 2
+
+    def test_classify_batch_deferred_malformed_entry(self, categorizer):
+        """Test a malformed batch result only drops its own prompt."""
+        txns = [
+            ParsedTransaction(
+                date=datetime(2025, 1, 15),
+                amount=Decimal("100.00"),
+                merchant=f"UNKNOWN {i}",
+                description=f"PURCHASE {i}"
+            )
+            for i in range(2)
+        ]
+
+        def succeeded(custom_id, classification):
+            return Mock(
+                custom_id=custom_id,
+                result=Mock(
+                    type="succeeded",
+                    message=Mock(content=[Mock(text=json.dumps([classification]))]),
+                ),
+            )
+
+        batches = categorizer.client.messages.batches
+        batches.create.return_value = Mock(id="batch-1", processing_status="ended")
+        batches.results.return_value = [
+            succeeded(
+                "classify-0",
+                {
+                    "account_code": "6120",
+                    "account_name": "Transportation",
+                    "confidence": None,
+                },
+            ),
+            succeeded(
+                "classify-1",
+                {
+                    "account_code": "6100",
+                    "account_name": "Office Supplies",
+                    "confidence": 0.7,
+                },
+            ),
+        ]
+
+        result = categorizer.classify_batch_deferred(
+            txns, entity="solaire", batch_size=1
+        )
+
+        assert [ct.classification.account_code for ct in result.classified] == ["6100"]
+        assert result.unclassified == txns[:1]
+
+    def test_parse_fenced_claude_response(self, categorizer):
+        """Test markdown code fences around Claude's JSON are stripped."""
+        body = json.dumps([{
+            "account_code": "6120", "account_name": "Transportation", "confidence": 0.8
+        }])
+
+        for text in (
+            body,
+            f"```json\n{body}\n```",
+            f"```\n{body}```",
+            f"  ```json{body}\n```\n",
+        ):
+            classifications = categorizer._parse_claude_response(text, 1)
+            assert classifications[0].account_code == "6120"
+
+
+class TestRateLimiter:
+    """Tests for the client-side Claude rate limiter."""
+
+    def test_waits_only_when_budget_exhausted(self):
+        """Test requests are delayed just long enough to refill the buckets."""
+        from card_processor._rate_limiter import RateLimiter
+
+        with patch("card_processor._rate_limiter.time.monotonic", return_value=100.0):
+            limiter = RateLimiter(requests_per_minute=2, tokens_per_minute=6000)
+
+            assert limiter.reserve(1000) == 0
+            assert limiter.reserve(1000) == 0
+            assert limiter.reserve(1000) == pytest.approx(30.0)  # request bucket empty
+            assert limiter.reserve(5000) == pytest.approx(
+                60.0
+            )  # queued behind the previous one
+
+            token_limiter = RateLimiter(tokens_per_minute=6000)
+            assert token_limiter.reserve(4000) == 0
+            assert token_limiter.reserve(4000) == pytest.approx(
+                20.0
+            )  # 2000 tokens short
+
+        with patch("card_processor._rate_limiter.time.monotonic", return_value=190.0):
+            assert limiter.reserve(0) == 0
+
+    def test_retry_after_seconds(self):
+        """Test retry delay prefers the retry-after header over backoff."""
+        from card_processor._rate_limiter import retry_after_seconds
+
+        def error(headers):
+            return Mock(response=Mock(headers=headers))
+
+        assert retry_after_seconds(error({"retry-after": "7"}), 0) == 7.0
+        assert retry_after_seconds(error({}), 2) == 4.0
+        assert retry_after_seconds(error({"retry-after": "600"}), 0) == 60.0
+
 
 class TestParseResult:
     """Tests for ParseResult dataclass."""